@@ -0,0 +1,100 @@
+"""
+Startup time of the CLI, which batch schedulers start once per file.
+
+Runs `python -m parquet_anonymizer.cli --help` repeatedly in fresh interpreters and checks that
+importing the CLI and the field type factory doesn't load the heavy libraries the commands use.
+Exits with an error when either check fails, e.g.
+
+    python benchmarks/startup.py --runs 20 --max-seconds 0.25
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import click
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that must only be imported once a command runs, or once a field type that needs them
+# is used. The field types all work on polars series, so the factory may load polars itself.
+HEAVY_IMPORTS = {
+    "parquet_anonymizer.cli": ("polars", "pyarrow", "faker", "numpy", "dateutil"),
+    "parquet_anonymizer.field_types.field_type_factory": ("pyarrow", "faker", "dateutil"),
+}
+
+
+def _environment():
+    environment = dict(os.environ)
+    environment["PYTHONPATH"] = os.pathsep.join(
+        [REPO_DIR] + [path for path in [environment.get("PYTHONPATH")] if path]
+    )
+    return environment
+
+
+def time_help(runs):
+    """Wall-clock seconds of each `--help` run"""
+    durations = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-m", "parquet_anonymizer.cli", "--help"],
+            check=True,
+            stdout=subprocess.DEVNULL,
+            env=_environment(),
+        )
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def modules_imported(module_name, candidates):
+    """The `candidates` a fresh interpreter has loaded after importing `module_name`"""
+    script = (
+        f"import json, sys, {module_name}; "
+        + f"print(json.dumps([m for m in {candidates!r} if m in sys.modules]))"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", script],
+        check=True,
+        capture_output=True,
+        text=True,
+        env=_environment(),
+    ).stdout
+    return json.loads(output)
+
+
+@click.command()
+@click.option("--runs", type=click.IntRange(min=1), default=10, show_default=True)
+@click.option(
+    "--max-seconds",
+    type=float,
+    help="Fail when the median `--help` run takes longer than this.",
+)
+def main(runs, max_seconds):
+    durations = time_help(runs)
+    result = {
+        "runs": runs,
+        "min_seconds": round(min(durations), 4),
+        "median_seconds": round(statistics.median(durations), 4),
+        "heavy_imports": {
+            name: modules_imported(name, candidates) for name, candidates in HEAVY_IMPORTS.items()
+        },
+    }
+    click.echo(json.dumps(result, indent=2))
+
+    failures = [
+        f"importing {name} loads {', '.join(modules)}"
+        for name, modules in result["heavy_imports"].items()
+        if modules
+    ]
+    if max_seconds is not None and result["median_seconds"] > max_seconds:
+        failures.append(f"median startup {result['median_seconds']}s exceeds {max_seconds}s")
+    if failures:
+        raise click.ClickException("; ".join(failures))
+
+
+if __name__ == "__main__":
+    main()
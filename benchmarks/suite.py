@@ -0,0 +1,373 @@
+"""
+Throughput and memory benchmarks on synthetic data.
+
+Generates a column for every accepted field type, with a configurable number of rows and share of
+distinct values, and measures
+
+- anonymize_dataframe on each field type's column on its own,
+- anonymize_csv, anonymize_parquet and anonymize_xlsx on a file holding all the columns,
+- generate_yaml_config on the same files.
+
+Every case runs in a fresh process, so its peak RSS isn't inflated by the cases before it. The
+results are written as JSON, and compared against a stored baseline of an earlier run, e.g.
+
+    python benchmarks/suite.py --rows 100000 --out results.json
+    python benchmarks/suite.py --rows 100000 --baseline results.json --out after.json
+
+Cases whose throughput dropped, or whose peak RSS grew, by more than --tolerance make the run fail.
+"""
+
+import json
+import multiprocessing
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import click
+import polars as pl
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from parquet_anonymizer.field_types.field_type_factory import FieldTypeFactory  # noqa: E402
+
+BENCHMARKS = (
+    "anonymize_dataframe",
+    "anonymize_csv",
+    "anonymize_parquet",
+    "anonymize_xlsx",
+    "generate_yaml_config",
+)
+FILE_FORMATS = {
+    "anonymize_csv": "csv",
+    "anonymize_parquet": "parquet",
+    "anonymize_xlsx": "xlsx",
+}
+SECRET_KEY = "BENCHMARK"
+
+# Settings of the field types that require some; all others are benchmarked with just their type
+TYPE_CONFIGS = {
+    "custom": {"format": "###-???"},
+    "datetime": {
+        "format": "%Y-%m-%d",
+        "range_start_date": "1950-01-01",
+        "range_end_date": "2020-12-31",
+    },
+    "float_range": {"start": 0, "end": 1000, "precision": 2},
+    "int_range": {"start": 0, "end": 1000},
+    "normal_int": {"mean": 50, "st_dev": 10},
+    "options": {"options": ["a", "b", "c", "d"]},
+    "zip": {"mask": "11100"},
+}
+
+# Kind of the synthetic values of the field types that don't anonymize text
+VALUE_KINDS = {
+    "datetime": "date",
+    "float_range": "float",
+    "int_range": "int",
+    "normal_int": "int",
+    "safe_harbor_age": "int",
+    "zip": "zip",
+}
+
+
+def column_config(type_name) -> dict:
+    return {"type": type_name, **TYPE_CONFIGS.get(type_name, {})}
+
+
+def synthetic_column(type_name, rows, distinct, seed=0) -> pl.Series:
+    """
+    A column of `rows` values with `distinct` different values, in random order. Each distinct
+    value occurs equally often.
+    """
+    ids = pl.int_range(0, rows, eager=True).shuffle(seed) % max(1, distinct)
+    kind = VALUE_KINDS.get(type_name, "text")
+    if kind == "int":
+        values = ids
+    elif kind == "float":
+        values = ids / 7
+    elif kind == "date":
+        values = (ids + 3650).cast(pl.Date)
+    elif kind == "zip":
+        values = (ids % 100_000).cast(pl.Utf8).str.zfill(5)
+    else:
+        values = pl.lit(f"{type_name}-") + ids.cast(pl.Utf8)
+        values = pl.select(values).to_series()
+    return values.alias(type_name)
+
+
+def synthetic_dataframe(type_names, rows, distinct) -> pl.DataFrame:
+    return pl.DataFrame(
+        [
+            synthetic_column(type_name, rows, distinct, seed)
+            for seed, type_name in enumerate(type_names)
+        ]
+    )
+
+
+def write_synthetic_file(df: pl.DataFrame, path):
+    file_format = os.path.splitext(path)[1][1:]
+    if file_format == "csv":
+        df.write_csv(path)
+    elif file_format == "parquet":
+        df.write_parquet(path)
+    else:
+        df.write_excel(path)
+
+
+def run_case(case: dict) -> dict:
+    """Runs one case in the current process, `repeat` times, and measures it."""
+    from parquet_anonymizer.anonymizer import (
+        anonymize_csv,
+        anonymize_dataframe,
+        anonymize_parquet,
+        anonymize_xlsx,
+    )
+    from parquet_anonymizer.config import Config
+    from parquet_anonymizer.config_generator import generate_yaml_config
+    from parquet_anonymizer.metrics import peak_rss_mb
+
+    config = Config(**case["config"])
+    config.secret_key = SECRET_KEY
+    for type_name in case["types"]:
+        config.add_column_config(type_name, column_config(type_name))
+
+    benchmark = case["benchmark"]
+    if benchmark == "anonymize_dataframe":
+        df = synthetic_dataframe(case["types"], case["rows"], case["distinct"])
+
+        def work():
+            anonymize_dataframe(config, df)
+
+    elif benchmark == "generate_yaml_config":
+
+        def work():
+            generate_yaml_config(
+                case["input"], True, ",", workers=1, config_file_name=case["output"]
+            )
+
+    else:
+        anonymize = {
+            "anonymize_csv": anonymize_csv,
+            "anonymize_parquet": anonymize_parquet,
+            "anonymize_xlsx": anonymize_xlsx,
+        }[benchmark]
+
+        def work():
+            anonymize(config, case["input"], case["output"])
+
+    durations = []
+    for _ in range(case["repeat"]):
+        start = time.perf_counter()
+        work()
+        durations.append(time.perf_counter() - start)
+    return {
+        "seconds": round(min(durations), 4),
+        "median_seconds": round(statistics.median(durations), 4),
+        "rows_per_second": round(case["rows"] / max(min(durations), 1e-9)),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def measure(case: dict) -> dict:
+    """Runs a case in a fresh process, recording an error instead of stopping the suite."""
+    with ProcessPoolExecutor(
+        max_workers=1, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        try:
+            return executor.submit(run_case, case).result()
+        except Exception as e:
+            return {"error": f"{type(e).__name__}: {e}"}
+
+
+def build_cases(benchmarks, type_names, rows, distinct, repeat, config, data_dir) -> list[dict]:
+    cases = []
+    if "anonymize_dataframe" in benchmarks:
+        for type_name in type_names:
+            cases.append(
+                {
+                    "name": f"anonymize_dataframe[{type_name}]",
+                    "benchmark": "anonymize_dataframe",
+                    "types": [type_name],
+                }
+            )
+    file_formats = {FILE_FORMATS[name] for name in benchmarks if name in FILE_FORMATS}
+    if "generate_yaml_config" in benchmarks:
+        file_formats.update(FILE_FORMATS.values())
+    if file_formats:
+        df = synthetic_dataframe(type_names, rows, distinct)
+    for file_format in sorted(file_formats):
+        in_filename = os.path.join(data_dir, f"synthetic.{file_format}")
+        write_synthetic_file(df, in_filename)
+        for benchmark, output in [
+            (f"anonymize_{file_format}", f"anonymized.{file_format}"),
+            ("generate_yaml_config", f"generated-{file_format}.yml"),
+        ]:
+            if benchmark in benchmarks:
+                cases.append(
+                    {
+                        "name": f"{benchmark}[{file_format}]",
+                        "benchmark": benchmark,
+                        "types": type_names,
+                        "input": in_filename,
+                        "output": os.path.join(data_dir, output),
+                    }
+                )
+    for case in cases:
+        case.update(rows=rows, distinct=distinct, repeat=repeat, config=config)
+    return cases
+
+
+def compare(cases: list[dict], baseline: dict, tolerance: float) -> list[dict]:
+    """
+    Relative changes of throughput and peak RSS against the baseline's cases of the same name.
+    A case regressed when either changed for the worse by more than `tolerance`.
+    """
+    baseline_cases = {case["name"]: case for case in baseline.get("cases", [])}
+    comparisons = []
+    for case in cases:
+        before = baseline_cases.get(case["name"])
+        if before is None or "error" in before or "error" in case:
+            continue
+        throughput = case["rows_per_second"] / before["rows_per_second"] - 1
+        memory = case["peak_rss_mb"] / before["peak_rss_mb"] - 1
+        comparisons.append(
+            {
+                "name": case["name"],
+                "rows_per_second_change": round(throughput, 3),
+                "peak_rss_change": round(memory, 3),
+                "regressed": throughput < -tolerance or memory > tolerance,
+            }
+        )
+    return comparisons
+
+
+def environment() -> dict:
+    import faker
+    import pyarrow
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "polars": pl.__version__,
+        "pyarrow": pyarrow.__version__,
+        "faker": faker.VERSION,
+    }
+
+
+@click.command()
+@click.option("--rows", type=click.IntRange(min=1), default=10_000, show_default=True)
+@click.option(
+    "--cardinality",
+    type=click.FloatRange(min=0, max=1, min_open=True),
+    default=0.5,
+    show_default=True,
+    help="Share of distinct values in each column.",
+)
+@click.option(
+    "--types",
+    help="Comma-separated field types to benchmark. Defaults to all accepted types.",
+)
+@click.option(
+    "--benchmarks",
+    default=",".join(BENCHMARKS),
+    show_default=True,
+    help="Comma-separated benchmarks to run.",
+)
+@click.option("--repeat", type=click.IntRange(min=1), default=3, show_default=True)
+@click.option("--vectorized", is_flag=True, help="Anonymize with vectorized field types.")
+@click.option("--streaming", is_flag=True, help="Anonymize files in batches.")
+@click.option(
+    "--data-dir",
+    type=click.Path(file_okay=False),
+    help="Directory for the synthetic files and outputs. Defaults to a temporary directory.",
+)
+@click.option("--out", type=click.Path(dir_okay=False), help="Write the results to this file.")
+@click.option(
+    "--baseline",
+    type=click.Path(exists=True, dir_okay=False),
+    help="Results of an earlier run to compare against.",
+)
+@click.option(
+    "--tolerance",
+    type=click.FloatRange(min=0),
+    default=0.2,
+    show_default=True,
+    help="Relative change beyond which a case counts as regressed.",
+)
+def main(
+    rows,
+    cardinality,
+    types,
+    benchmarks,
+    repeat,
+    vectorized,
+    streaming,
+    data_dir,
+    out,
+    baseline,
+    tolerance,
+):
+    type_names = types.split(",") if types else list(FieldTypeFactory.ACCEPTED_TYPES)
+    for type_name in type_names:
+        if type_name not in FieldTypeFactory.ACCEPTED_TYPES:
+            raise click.BadParameter(f"Field type {type_name} not accepted.", param_hint="--types")
+    benchmarks = benchmarks.split(",")
+    for benchmark in benchmarks:
+        if benchmark not in BENCHMARKS:
+            raise click.BadParameter(f"Unknown benchmark {benchmark}.", param_hint="--benchmarks")
+    config = {"vectorized": vectorized, "streaming": streaming}
+    distinct = max(1, round(rows * cardinality))
+
+    with tempfile.TemporaryDirectory() as temporary_dir:
+        data_dir = data_dir or temporary_dir
+        os.makedirs(data_dir, exist_ok=True)
+        cases = build_cases(benchmarks, type_names, rows, distinct, repeat, config, data_dir)
+        results = []
+        for case in cases:
+            result = {"name": case["name"], **measure(case)}
+            results.append(result)
+            click.echo(
+                f"{case['name']}: "
+                + (
+                    result["error"]
+                    if "error" in result
+                    else f"{result['rows_per_second']} rows/s, {result['peak_rss_mb']} MB"
+                ),
+                err=True,
+            )
+
+    report = {
+        "environment": environment(),
+        "settings": {
+            "rows": rows,
+            "distinct": distinct,
+            "repeat": repeat,
+            "vectorized": vectorized,
+            "streaming": streaming,
+        },
+        "cases": results,
+    }
+    regressed = []
+    if baseline is not None:
+        with open(baseline) as baseline_file:
+            report["comparison"] = compare(results, json.load(baseline_file), tolerance)
+        regressed = [
+            comparison["name"] for comparison in report["comparison"] if comparison["regressed"]
+        ]
+
+    if out is None:
+        click.echo(json.dumps(report, indent=2))
+    else:
+        with open(out, "w") as out_file:
+            json.dump(report, out_file, indent=2)
+    if regressed:
+        raise click.ClickException(f"Regressed against the baseline: {', '.join(regressed)}")
+
+
+if __name__ == "__main__":
+    main()
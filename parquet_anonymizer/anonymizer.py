@@ -1,13 +1,53 @@
+import logging
+import os
+import time
+from contextlib import ExitStack, contextmanager
+from typing import Callable, Iterable, Iterator
+
 import polars as pl
+import pyarrow as pa
+import pyarrow.parquet as pq
 
+from parquet_anonymizer import profiling
 from parquet_anonymizer.config import Config
+from parquet_anonymizer.field_types import BaseFieldType
 from parquet_anonymizer.field_types.field_type_factory import FieldTypeFactory
+from parquet_anonymizer.field_types.provider_pools import PoolOverflowCheck
+from parquet_anonymizer.mapping_cache import MappingCache
+from parquet_anonymizer.metrics import Metrics
+from parquet_anonymizer.parallel import ColumnWorkerPool
+from parquet_anonymizer.parquet_layout import parquet_writer_options
 from parquet_anonymizer.user.user_callback import UserCallback
 
 
 def anonymize_dataframe(
-    config: Config, df: pl.DataFrame, user_callback: UserCallback = None
+    config: Config,
+    df: pl.DataFrame,
+    user_callback: UserCallback = None,
+    workers: int = None,
+    cache: MappingCache = None,
+    metrics: Metrics = None,
+    pool_check: PoolOverflowCheck = None,
 ) -> pl.DataFrame:
+    """
+    Anonymizes the configured columns of a dataframe. With more than one worker (either passed in
+    or taken from the config) the work is spread over a pool of processes. With the mapping cache
+    enabled in the config, previously anonymized values are looked up instead of generated. Each
+    column's timings and counts are added to `metrics`, if given, and its distinct values to
+    `pool_check`, which counts them across all the batches of a file.
+    """
+    if cache is None and config.cache:
+        with MappingCache(config.cache_dir, config.cache_max_size) as cache:
+            return anonymize_dataframe(
+                config, df, user_callback, workers, cache, metrics, pool_check
+            )
+    workers = config.workers if workers is None else workers
+    if workers > 1:
+        with ColumnWorkerPool(config, workers, user_callback, cache, metrics) as pool:
+            return pool.anonymize_dataframe(df)
+    if pool_check is None:
+        pool_check = PoolOverflowCheck(config)
+
     for column_name in config.columns_to_anonymize:
         if column_name not in df.columns:
             raise ValueError(f"{column_name} not found in dataframe.")
@@ -17,40 +57,418 @@ def anonymize_dataframe(
 
         if field_type is not None:
             df = df.with_columns(
-                pl.when(pl.col(column_name).is_not_null())
-                .then(
-                    pl.col(column_name).map_elements(
-                        lambda x: field_type.generate_obfuscated_value(
-                            config.secret_key, x, user_callback
-                        ), return_dtype=df[column_name].dtype
-                    )
+                anonymize_series(
+                    config.secret_key,
+                    df[column_name],
+                    field_type,
+                    user_callback,
+                    vectorized=config.vectorized,
+                    cache=cache,
+                    metrics=metrics,
+                    pool_check=pool_check,
                 )
-                .otherwise(pl.col(column_name))
-                .alias(column_name)
             )
 
     return df
 
 
+def anonymize_series(
+    secret_key: str,
+    series: pl.Series,
+    field_type: BaseFieldType,
+    user_callback: UserCallback = None,
+    vectorized: bool = False,
+    cache: MappingCache = None,
+    metrics: Metrics = None,
+    pool_check: PoolOverflowCheck = None,
+) -> pl.Series:
+    """
+    Anonymizes a single column.
+
+    The obfuscated value only depends on the secret key and the original value, so every distinct
+    non-null value is anonymized exactly once and the results are mapped back onto the rows.
+    Nulls are left untouched. With `vectorized` set, field types that support it generate all
+    values in one go from natively computed seeds; their output differs from the per-value path.
+    Values found in the `cache` are not generated again. The `user_callback` is applied to all the
+    column's distinct values at once, cached or not, through UserCallback.handle_batch.
+    """
+    if metrics is None:
+        metrics = Metrics(enabled=False)
+    start = time.perf_counter()
+    type_name = field_type.type_config_dict["type"]
+    uniques = series.drop_nulls().unique()
+    if uniques.is_empty():
+        metrics.record_column(series, uniques, type_name, time.perf_counter() - start)
+        return series
+    if pool_check is not None:
+        pool_check.add(series.name, uniques)
+    cache_hits = 0
+    if cache is None:
+        anonymized = anonymize_uniques(secret_key, uniques, field_type, user_callback, vectorized)
+    else:
+        lookup = cache.lookup(secret_key, field_type, vectorized, uniques)
+        cache_hits = len(uniques) - len(lookup.missing)
+        generated = None
+        if not lookup.missing.is_empty():
+            generated = anonymize_uniques(
+                secret_key, lookup.missing, field_type, user_callback, vectorized
+            )
+        anonymized = lookup.complete(generated)
+    anonymized = apply_user_callback(user_callback, field_type, uniques, anonymized)
+    anonymized = field_type.cast_output(anonymized)
+    anonymized = series.replace_strict(uniques, anonymized, return_dtype=anonymized.dtype)
+    metrics.record_column(series, uniques, type_name, time.perf_counter() - start, cache_hits)
+    return anonymized
+
+
+def anonymize_uniques(
+    secret_key: str,
+    uniques: pl.Series,
+    field_type: BaseFieldType,
+    user_callback: UserCallback = None,
+    vectorized: bool = False,
+) -> pl.Series:
+    """
+    Generates the anonymized value for each of a column's distinct non-null values. When
+    profiling, the time counts for the field type's section.
+    """
+    with profiling.field_type_section(field_type.type_config_dict["type"]):
+        if vectorized and field_type.VECTORIZED:
+            return field_type.generate_obfuscated_series(secret_key, uniques)
+        return uniques.map_elements(
+            lambda x: field_type.generate_obfuscated_value(secret_key, x, user_callback),
+            return_dtype=uniques.dtype,
+        )
+
+
+def apply_user_callback(
+    user_callback: UserCallback,
+    field_type: BaseFieldType,
+    uniques: pl.Series,
+    anonymized: pl.Series,
+) -> pl.Series:
+    """Passes a column's distinct values and their anonymized values to the user callback."""
+    if user_callback is None:
+        return anonymized
+    type_name = field_type.type_config_dict["type"]
+    with profiling.field_type_section(type_name):
+        return user_callback.handle_batch(type_name, uniques, anonymized)
+
+
+@contextmanager
+def dataframe_anonymizer(
+    config: Config, user_callback: UserCallback = None, metrics: Metrics = None
+) -> Iterator[Callable[[pl.DataFrame], pl.DataFrame]]:
+    """
+    Provides a function that anonymizes dataframes with the given config. Worker processes and
+    the mapping cache are set up once and shared by all dataframes, e.g. all the batches of a
+    streamed file. The columns of all dataframes are recorded in `metrics`, if given.
+    """
+    with ExitStack() as stack:
+        cache = None
+        if config.cache:
+            cache = stack.enter_context(MappingCache(config.cache_dir, config.cache_max_size))
+        if config.workers > 1:
+            pool = stack.enter_context(
+                ColumnWorkerPool(config, config.workers, user_callback, cache, metrics)
+            )
+            yield pool.anonymize_dataframe
+        else:
+            pool_check = PoolOverflowCheck(config)
+            yield lambda df: anonymize_dataframe(
+                config, df, user_callback, 1, cache, metrics, pool_check
+            )
+
+
 def anonymize_csv(
-    config: Config, in_filename: str, out_filename: str, user_callback: UserCallback = None
+    config: Config,
+    in_filename: str,
+    out_filename: str,
+    user_callback: UserCallback = None,
+    metrics: Metrics = None,
 ):
-    df = pl.read_csv(in_filename, separator=config.delimiter)
-    df = anonymize_dataframe(config, df, user_callback)
-    df.write_csv(out_filename, separator=config.delimiter)
+    """
+    Anonymizes a CSV file. With `streaming` enabled in the config the file is read, anonymized
+    and appended to the output in batches of roughly `batch_size` rows.
+    """
+    if metrics is None:
+        metrics = Metrics(enabled=False)
+    if config.streaming:
+        batches = read_csv_batches(in_filename, config.delimiter, config.batch_size)
+    else:
+        with metrics.stage("read"):
+            batches = [pl.read_csv(in_filename, separator=config.delimiter)]
+    with dataframe_anonymizer(config, user_callback, metrics) as anonymize:
+        with metrics.stage("write") as stage:
+            stage["rows"] += write_csv_batches(
+                timed_pipeline(batches, anonymize, metrics), out_filename, config.delimiter
+            )
+
+
+def timed_pipeline(
+    batches: Iterable[pl.DataFrame],
+    anonymize: Callable[[pl.DataFrame], pl.DataFrame],
+    metrics: Metrics,
+) -> Iterator[pl.DataFrame]:
+    """Anonymizes `batches`, timing the reading and the anonymizing of each as a stage."""
+    batches = map(anonymize, metrics.timed_batches("read", batches))
+    return metrics.timed_batches("anonymize", batches)
+
+
+def read_csv_batches(
+    in_filename: str, delimiter: str, batch_size: int, has_header: bool = True
+) -> Iterator[pl.DataFrame]:
+    """Yields batches of roughly `batch_size` rows using polars' batched CSV reader."""
+    reader = pl.read_csv_batched(
+        in_filename, separator=delimiter, batch_size=batch_size, has_header=has_header
+    )
+    empty = True
+    while (batches := reader.next_batches(1)) is not None:
+        empty = False
+        yield from batches
+    if empty:
+        # still produce the header row for a file without any data rows
+        yield pl.read_csv(in_filename, separator=delimiter, has_header=has_header, n_rows=0)
+
+
+def write_csv_batches(batches: Iterable[pl.DataFrame], out_filename: str, delimiter: str) -> int:
+    """
+    Appends dataframes to a single CSV file, writing the header only once. Returns the number of
+    rows written.
+    """
+    rows = 0
+    with open(out_filename, "wb") as out_file:
+        for batch_number, batch in enumerate(batches):
+            batch.write_csv(out_file, separator=delimiter, include_header=batch_number == 0)
+            rows += len(batch)
+    return rows
 
 
 def anonymize_parquet(
-    config: Config, in_filename: str, out_filename: str, user_callback: UserCallback = None
+    config: Config,
+    in_filename: str,
+    out_filename: str,
+    user_callback: UserCallback = None,
+    metrics: Metrics = None,
 ):
-    df = pl.read_parquet(in_filename)
-    df = anonymize_dataframe(config, df, user_callback)
-    df.write_parquet(out_filename)
+    """
+    Anonymizes a parquet file. With `streaming` enabled in the config the file is processed
+    `batch_size` rows at a time, so peak memory depends on the batch size and row group size
+    rather than the file size. Both paths produce identical files, written with
+    parquet_writer_options, i.e. row groups of `batch_size` rows and zstd compression unless
+    configured otherwise. With `passthrough` enabled, anonymize_parquet_passthrough is used
+    instead.
+    """
+    if config.passthrough:
+        return anonymize_parquet_passthrough(
+            config, in_filename, out_filename, user_callback, metrics
+        )
+    if metrics is None:
+        metrics = Metrics(enabled=False)
+    if config.streaming:
+        batches = read_parquet_batches(in_filename, config.batch_size)
+    else:
+        with metrics.stage("read"):
+            batches = [pl.read_parquet(in_filename)]
+    with dataframe_anonymizer(config, user_callback, metrics) as anonymize:
+        with metrics.stage("write") as stage:
+            stage["rows"] += write_parquet_batches(
+                timed_pipeline(batches, anonymize, metrics),
+                out_filename,
+                parquet_writer_options(config, in_filename),
+            )
+
+
+def read_parquet_batches(in_filename: str, batch_size: int) -> Iterator[pl.DataFrame]:
+    """Yields consecutive slices of at most `batch_size` rows, reading only needed row groups."""
+    lf = pl.scan_parquet(in_filename)
+    row_count = lf.select(pl.len()).collect().item()
+    if row_count == 0:
+        yield lf.collect()
+        return
+    for offset in range(0, row_count, batch_size):
+        yield lf.slice(offset, batch_size).collect()
+
+
+def anonymize_parquet_passthrough(
+    config: Config,
+    in_filename: str,
+    out_filename: str,
+    user_callback: UserCallback = None,
+    metrics: Metrics = None,
+) -> dict:
+    """
+    Anonymizes a parquet file one row group at a time, converting only the configured columns to
+    polars. The other columns stay Arrow arrays from reading to writing, and the output keeps the
+    input's row groups, column order, types and schema metadata. An anonymized column keeps its
+    type unless its field type changes it, e.g. the Enum output of Options. All other
+    parquet_writer_options apply.
+
+    The untouched columns are not copied byte for byte: pyarrow cannot copy encoded column
+    chunks between files, so every column is decoded and re-encoded with the configured codec,
+    in Arrow's C++ reader and writer. Only the Python-side conversion of the untouched columns is
+    saved.
+
+    Returns the compressed bytes of the input's untouched and anonymized column chunks.
+    """
+    if metrics is None:
+        metrics = Metrics(enabled=False)
+    parquet_file = pq.ParquetFile(in_filename)
+    schema = parquet_file.schema_arrow
+    for column_name in config.columns_to_anonymize:
+        if column_name not in schema.names:
+            raise ValueError(f"{column_name} not found in dataframe.")
+    report = {"untouched_bytes": 0, "anonymized_bytes": 0}
+    metadata = parquet_file.metadata
+    for row_group in range(metadata.num_row_groups):
+        for column in range(metadata.num_columns):
+            chunk = metadata.row_group(row_group).column(column)
+            # nested columns are stored as one chunk per leaf, e.g. "address.city"
+            anonymized = chunk.path_in_schema.split(".")[0] in config.columns_to_anonymize
+            report["anonymized_bytes" if anonymized else "untouched_bytes"] += (
+                chunk.total_compressed_size
+            )
+
+    options = parquet_writer_options(config, in_filename)
+    options.pop("row_group_size")
+    key_value_metadata = {**(schema.metadata or {}), **options.pop("metadata")}
+    writer = None
+    try:
+        with dataframe_anonymizer(config, user_callback, metrics) as anonymize:
+            for row_group in range(max(metadata.num_row_groups, 1)):
+                with metrics.stage("read") as stage:
+                    if metadata.num_row_groups == 0:
+                        table = schema.empty_table()
+                    else:
+                        table = parquet_file.read_row_group(row_group)
+                    stage["rows"] += table.num_rows
+                with metrics.stage("anonymize") as stage:
+                    df = anonymize(pl.from_arrow(table.select(list(config.columns_to_anonymize))))
+                    table = _replace_columns(table, df)
+                    stage["rows"] += table.num_rows
+                with metrics.stage("write") as stage:
+                    if writer is None:
+                        writer = pq.ParquetWriter(
+                            out_filename, table.schema.with_metadata(key_value_metadata), **options
+                        )
+                    writer.write_table(table, row_group_size=max(table.num_rows, 1))
+                    stage["rows"] += table.num_rows
+    finally:
+        if writer is not None:
+            writer.close()
+    logging.info(
+        f"{in_filename}: {report['untouched_bytes']} bytes of untouched and "
+        + f"{report['anonymized_bytes']} bytes of anonymized columns, all re-encoded."
+    )
+    return report
+
+
+def _replace_columns(table: pa.Table, df: pl.DataFrame) -> pa.Table:
+    """Puts the columns of `df` into `table`, keeping the table's types where they still fit."""
+    for column_name in df.columns:
+        index = table.schema.get_field_index(column_name)
+        field = table.schema.field(index)
+        array = df[column_name].to_arrow()
+        if pl.from_arrow(pa.array([], type=field.type)).dtype == df[column_name].dtype:
+            # e.g. polars' large_string back to the input's string
+            array = array.cast(field.type)
+        table = table.set_column(index, field.with_type(array.type), array)
+    return table
+
+
+def write_parquet_batches(
+    batches: Iterable[pl.DataFrame], out_filename: str, options: dict = None
+) -> int:
+    """
+    Writes dataframes to a single parquet file, splitting them into row groups of fixed size.
+    Rows are buffered across dataframes, so every row group but the last is full however the
+    dataframes are sized, and the file is the same as writing all rows at once. `options` are as
+    returned by parquet_writer_options. Returns the number of rows written.
+    """
+    options = dict(options or parquet_writer_options(Config()))
+    row_group_size = options.pop("row_group_size")
+    key_value_metadata = options.pop("metadata")
+    writer = None
+    pending = []
+    pending_rows = 0
+    rows = 0
+    try:
+        for batch in batches:
+            table = batch.to_arrow()
+            if writer is None:
+                schema = table.schema
+                if key_value_metadata:
+                    schema = schema.with_metadata(key_value_metadata)
+                writer = pq.ParquetWriter(out_filename, schema, **options)
+            pending.append(table)
+            pending_rows += table.num_rows
+            if pending_rows >= row_group_size:
+                table = pa.concat_tables(pending)
+                full_rows = pending_rows - pending_rows % row_group_size
+                _write_row_groups(writer, table.slice(0, full_rows), row_group_size)
+                rows += full_rows
+                pending = [table.slice(full_rows)]
+                pending_rows -= full_rows
+        if writer is not None and (pending_rows or rows == 0):
+            # the last, possibly short, row group; or an empty file's only one
+            _write_row_groups(writer, pa.concat_tables(pending), row_group_size)
+            rows += pending_rows
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+def _write_row_groups(writer: pq.ParquetWriter, table: pa.Table, row_group_size: int):
+    # one chunk per column, so the pages don't depend on how the rows arrived in batches
+    writer.write_table(table.combine_chunks(), row_group_size=row_group_size)
 
 
 def anonymize_xlsx(
-    config: Config, in_filename: str, out_filename: str, user_callback: UserCallback = None
+    config: Config,
+    in_filename: str,
+    out_filename: str,
+    user_callback: UserCallback = None,
+    metrics: Metrics = None,
+):
+    if metrics is None:
+        metrics = Metrics(enabled=False)
+    with metrics.stage("read") as stage:
+        df = pl.read_excel(in_filename)
+        stage["rows"] += len(df)
+    with metrics.stage("anonymize") as stage:
+        df = anonymize_dataframe(config, df, user_callback, metrics=metrics)
+        stage["rows"] += len(df)
+    with metrics.stage("write") as stage:
+        df.write_excel(out_filename)
+        stage["rows"] += len(df)
+
+
+# File extensions anonymize_path understands and the function handling each of them
+SUPPORTED_EXTENSIONS = {
+    ".csv": anonymize_csv,
+    ".parquet": anonymize_parquet,
+    ".xlsx": anonymize_xlsx,
+}
+
+
+def anonymize_path(
+    config: Config,
+    in_filename: str,
+    out_filename: str,
+    user_callback: UserCallback = None,
+    metrics: Metrics = None,
 ):
-    df = pl.read_excel(in_filename)
-    df = anonymize_dataframe(config, df, user_callback)
-    df.write_excel(out_filename)
+    """
+    Anonymizes a CSV, parquet or Excel file, picking the format from the file extension. Returns
+    whatever the format's function reports, e.g. the column byte counts of a passthrough run.
+    Timings and counts of the stages and columns are recorded in `metrics`, if given.
+    """
+    extension = os.path.splitext(in_filename)[1].lower()
+    if extension not in SUPPORTED_EXTENSIONS:
+        raise ValueError(
+            f"Unsupported file format: {in_filename}. Supported formats are: csv, parquet, xlsx."
+        )
+    return SUPPORTED_EXTENSIONS[extension](
+        config, in_filename, out_filename, user_callback, metrics
+    )
@@ -0,0 +1,412 @@
+import copy
+import glob
+import json
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import nullcontext
+from urllib.parse import quote, unquote
+
+import polars as pl
+import pyarrow.parquet as pq
+import xxhash
+
+from parquet_anonymizer.anonymizer import SUPPORTED_EXTENSIONS, anonymize_path, anonymize_series
+from parquet_anonymizer.config import Config
+from parquet_anonymizer.field_types.field_type_factory import FieldTypeFactory
+from parquet_anonymizer.mapping_cache import MappingCache
+from parquet_anonymizer.metrics import Metrics
+from parquet_anonymizer.user.user_callback import UserCallback
+
+MANIFEST_FILE_NAME = "manifest.jsonl"
+HASH_BLOCK_SIZE = 8 * 1024 * 1024
+# Directory value hive writers use for a null partition value
+HIVE_NULL_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+
+_worker_state = {}
+
+
+def find_input_files(patterns, exclude=()) -> list[tuple[str, str]]:
+    """
+    Expands files, directories (searched recursively) and glob patterns into the supported files
+    they contain. Returns (path, relative path) pairs, where the relative path is taken from the
+    directory or from the part of the pattern before its first wildcard. Files that are, or are
+    inside, one of the `exclude` paths are left out.
+    """
+    excluded = [os.path.abspath(path) for path in exclude]
+    found = {}
+    for pattern in patterns:
+        root = input_root(pattern)
+        if os.path.isdir(pattern):
+            paths = glob.glob(os.path.join(glob.escape(pattern), "**", "*"), recursive=True)
+        elif glob.has_magic(pattern):
+            paths = glob.glob(pattern, recursive=True)
+        else:
+            paths = [pattern]
+        for path in paths:
+            extension = os.path.splitext(path)[1].lower()
+            if (
+                os.path.isfile(path)
+                and extension in SUPPORTED_EXTENSIONS
+                and not any(is_within(os.path.abspath(path), parent) for parent in excluded)
+            ):
+                found.setdefault(os.path.abspath(path), os.path.relpath(path, root or "."))
+    return sorted(found.items())
+
+
+def is_within(path, parent):
+    """Whether `path` is `parent` or inside it, both absolute paths."""
+    return os.path.commonpath([path, parent]) == parent
+
+
+def input_root(pattern):
+    """
+    The directory the relative paths of a file, directory or glob pattern's files are taken
+    from: the directory itself, the part of the pattern before its first wildcard or the file's
+    directory. Empty for the current directory.
+    """
+    if os.path.isdir(pattern):
+        return pattern
+    if not glob.has_magic(pattern):
+        return os.path.dirname(pattern)
+    root = []
+    for part in pattern.split(os.sep):
+        if glob.has_magic(part):
+            break
+        root.append(part)
+    return os.sep.join(root)
+
+
+def file_hash(path):
+    """xxh3 digest of a file's contents, read in blocks so large files are not loaded at once."""
+    digest = xxhash.xxh3_64()
+    with open(path, "rb") as f:
+        while block := f.read(HASH_BLOCK_SIZE):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def config_hash(config: Config):
+    """
+    Identifies the settings that change the anonymized output, including how the output files
+    are laid out and written, so a resumed run matches.
+    """
+    settings = {
+        "columns_to_anonymize": config.columns_to_anonymize,
+        "vectorized": config.vectorized,
+        # the vectorized seeds change with the polars version
+        "polars_version": pl.__version__ if config.vectorized else None,
+        "delimiter": config.delimiter,
+        "secret_key": xxhash.xxh3_128_hexdigest(config.secret_key.encode()),
+        "streaming": config.streaming,
+        "batch_size": config.batch_size,
+        "passthrough": config.passthrough,
+        "compression": config.compression,
+        "compression_level": config.compression_level,
+        "row_group_size": config.row_group_size,
+        "statistics": config.statistics,
+        "dictionary": config.dictionary,
+        "match_input_layout": config.match_input_layout,
+    }
+    return xxhash.xxh3_64_hexdigest(json.dumps(settings, sort_keys=True, default=str).encode())
+
+
+def read_manifest(manifest_path) -> dict:
+    """Returns the latest manifest entry of every input file."""
+    entries = {}
+    if os.path.isfile(manifest_path):
+        with open(manifest_path) as manifest:
+            for line in manifest:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # a line cut short by an interrupted run
+                    continue
+                entries[entry["input"]] = entry
+    return entries
+
+
+def _init_worker(config, user_types, user_callback):
+    FieldTypeFactory.USER_TYPES.update(user_types)
+    _worker_state["config"] = config
+    _worker_state["user_callback"] = user_callback
+
+
+def _anonymize_task(in_filename, out_filename, skip_columns=(), metrics=False):
+    return _anonymize_one(
+        _worker_state["config"],
+        in_filename,
+        out_filename,
+        _worker_state["user_callback"],
+        skip_columns,
+        metrics,
+    )
+
+
+def _anonymize_one(
+    config, in_filename, out_filename, user_callback, skip_columns=(), metrics=False
+):
+    started_at = time.time()
+    start = time.perf_counter()
+    result = {"started_at": started_at}
+    file_metrics = Metrics(enabled=metrics)
+    if skip_columns:
+        config = copy.deepcopy(config)
+        for column_name in skip_columns:
+            config.columns_to_anonymize.pop(column_name, None)
+    try:
+        # hashed here rather than before the run, so the workers hash their files in parallel
+        result["input_hash"] = file_hash(in_filename)
+        os.makedirs(os.path.dirname(out_filename) or ".", exist_ok=True)
+        result.update(
+            anonymize_path(config, in_filename, out_filename, user_callback, file_metrics) or {}
+        )
+        result["status"] = "done"
+        if metrics:
+            result["metrics"] = file_metrics.to_dict()
+    except Exception as e:
+        result["status"] = "failed"
+        result["error"] = f"{type(e).__name__}: {e}"
+        # do not leave a partial output behind that looks like a finished file
+        if os.path.isfile(out_filename):
+            os.remove(out_filename)
+    result["duration_seconds"] = round(time.perf_counter() - start, 3)
+    return result
+
+
+def anonymize_files(
+    config: Config,
+    patterns,
+    out_dir: str,
+    jobs: int = 1,
+    manifest_path: str = None,
+    user_callback: UserCallback = None,
+    metrics: bool = False,
+    exclude=(),
+) -> list[dict]:
+    """
+    Anonymizes every file matched by `patterns` into `out_dir`, keeping the files' relative paths.
+    Files in `out_dir`, the manifest and the `exclude` paths (e.g. the key file) are never
+    inputs, so an output directory inside an input directory is not anonymized again.
+
+    Up to `jobs` files are anonymized at once by worker processes that all share the one parsed
+    config. Each finished file is appended to a JSON lines manifest (`out_dir/manifest.jsonl` by
+    default) with the input's size, modification time and hash, the output path, its status and
+    timings. Files the manifest records as done, with an unchanged input, the same settings and
+    an existing output, are skipped, so an interrupted run can simply be started again. Returns
+    this run's entries, which include each file's Metrics.to_dict() with `metrics` set.
+    """
+    manifest_path = manifest_path or os.path.join(out_dir, MANIFEST_FILE_NAME)
+    tasks = [
+        (in_filename, os.path.join(out_dir, relative_path), ())
+        for in_filename, relative_path in find_input_files(
+            patterns, [out_dir, manifest_path, *exclude]
+        )
+    ]
+    return run_tasks(
+        config, tasks, jobs, manifest_path, config_hash(config), user_callback, metrics
+    )
+
+
+def anonymize_parquet_dataset(
+    config: Config,
+    in_dir: str,
+    out_dir: str,
+    jobs: int = 1,
+    manifest_path: str = None,
+    user_callback: UserCallback = None,
+    metrics: bool = False,
+    exclude=(),
+) -> list[dict]:
+    """
+    Anonymizes a hive-partitioned directory of parquet files (e.g. `dt=.../region=.../*.parquet`)
+    into an identically partitioned tree under `out_dir`, one file per task like anonymize_files.
+    The manifest defaults to `<out_dir>_manifest.jsonl`, so `out_dir` only holds parquet files.
+
+    Partition values only live in the directory names, so partition columns that are not
+    anonymized are never read into the rows. Partition columns listed in `columns_to_anonymize`
+    are anonymized once over all the dataset's partition values, and the output directories are
+    named after the anonymized values. Partitions whose values are anonymized to the same value,
+    as happens easily with Options, are merged into one output partition. Like anonymize_files,
+    files in `out_dir`, the manifest and the `exclude` paths are never inputs.
+    """
+    # next to rather than inside the output, where it would break reading the dataset back
+    manifest_path = manifest_path or dataset_sidecar_path(out_dir, MANIFEST_FILE_NAME)
+    files = [
+        (in_filename, relative_path)
+        for in_filename, relative_path in find_input_files(
+            [in_dir], [out_dir, manifest_path, *exclude]
+        )
+        if relative_path.lower().endswith(".parquet")
+    ]
+    mappings = _anonymize_partition_values(
+        config, [_partition_values(relative_path) for _, relative_path in files], user_callback
+    )
+
+    tasks = []
+    outputs = {}
+    for in_filename, relative_path in files:
+        parts = relative_path.split(os.sep)
+        for position, part in enumerate(parts[:-1]):
+            key, _, value = part.partition("=")
+            if key in mappings and unquote(value) in mappings[key]:
+                parts[position] = f"{key}={quote(mappings[key][unquote(value)], safe='')}"
+        out_filename = _unique_output(os.path.join(out_dir, *parts), outputs)
+        outputs[out_filename] = in_filename
+        # anonymized partition columns are only anonymized in files that also store them
+        stored_columns = pq.read_schema(in_filename).names
+        skip_columns = tuple(key for key in mappings if key not in stored_columns)
+        tasks.append((in_filename, out_filename, skip_columns))
+
+    return run_tasks(
+        config, tasks, jobs, manifest_path, config_hash(config), user_callback, metrics
+    )
+
+
+def _unique_output(out_filename, outputs):
+    """
+    Merges partitions whose values are anonymized to the same value into one output partition,
+    numbering the files that would otherwise overwrite each other: `part-0.parquet` of the
+    second partition becomes `part-0_1.parquet`. The inputs are sorted, so a resumed run picks
+    the same names.
+    """
+    stem, extension = os.path.splitext(out_filename)
+    number = 0
+    while out_filename in outputs:
+        number += 1
+        out_filename = f"{stem}_{number}{extension}"
+    return out_filename
+
+
+def dataset_sidecar_path(out_dir, file_name):
+    """Path of a file that belongs with a dataset, e.g. `out/data` -> `out/data_manifest.jsonl`"""
+    out_dir = os.path.normpath(out_dir)
+    return os.path.join(os.path.dirname(out_dir), f"{os.path.basename(out_dir)}_{file_name}")
+
+
+def _partition_values(relative_path) -> dict:
+    """The hive partition values in the directory names of a path, e.g. {"dt": "2024-01-01"}"""
+    values = {}
+    for part in relative_path.split(os.sep)[:-1]:
+        key, separator, value = part.partition("=")
+        if separator:
+            values[key] = unquote(value)
+    return values
+
+
+def _anonymize_partition_values(config: Config, partitions, user_callback) -> dict:
+    """Maps the values of every anonymized partition column to their anonymized string form."""
+    values = {}
+    for partition in partitions:
+        for key, value in partition.items():
+            if key in config.columns_to_anonymize and value != HIVE_NULL_PARTITION:
+                values.setdefault(key, set()).add(value)
+    mappings = {}
+    cache = MappingCache(config.cache_dir, config.cache_max_size) if config.cache else None
+    with cache or nullcontext():
+        for key, key_values in values.items():
+            series = pl.Series(key, sorted(key_values), dtype=pl.Utf8)
+            anonymized = anonymize_series(
+                config.secret_key,
+                series,
+                FieldTypeFactory.get_type(config.columns_to_anonymize[key]),
+                user_callback,
+                vectorized=config.vectorized,
+                cache=cache,
+            )
+            mappings[key] = dict(zip(series, anonymized.cast(pl.Utf8)))
+    return mappings
+
+
+def run_tasks(
+    config: Config,
+    tasks: list[tuple[str, str, tuple]],
+    jobs: int,
+    manifest_path: str,
+    settings_hash: str,
+    user_callback: UserCallback = None,
+    metrics: bool = False,
+) -> list[dict]:
+    """
+    Runs (input, output, columns to skip) tasks on up to `jobs` worker processes, skipping the
+    ones the manifest records as done and appending every finished task to the manifest. With
+    `metrics` set, every finished task's entry includes its metrics.
+
+    An input counts as unchanged when its size and modification time match the manifest, or
+    else when its hash does. Only inputs that were touched since are hashed here; the others are
+    hashed by the task anonymizing them.
+    """
+    previous = read_manifest(manifest_path)
+    pending = []
+    entries = []
+    for in_filename, out_filename, skip_columns in tasks:
+        out_filename = os.path.abspath(out_filename)
+        if out_filename == in_filename:
+            raise ValueError(f"Output would overwrite the input file: {in_filename}")
+        stat = os.stat(in_filename)
+        entry = {
+            "input": in_filename,
+            "input_size": stat.st_size,
+            "input_mtime_ns": stat.st_mtime_ns,
+            "config_hash": settings_hash,
+            "output": out_filename,
+        }
+        done = previous.get(in_filename, {})
+        if (
+            done.get("status") == "done"
+            and done.get("config_hash") == settings_hash
+            and done.get("output") == out_filename
+            and os.path.isfile(out_filename)
+            and (
+                (
+                    done.get("input_size") == stat.st_size
+                    and done.get("input_mtime_ns") == stat.st_mtime_ns
+                )
+                or done.get("input_hash") == file_hash(in_filename)
+            )
+        ):
+            entries.append({**done, "status": "skipped"})
+            continue
+        pending.append((entry, skip_columns))
+    logging.info(f"Anonymizing {len(pending)} files, skipping {len(entries)} finished ones.")
+
+    os.makedirs(os.path.dirname(os.path.abspath(manifest_path)), exist_ok=True)
+    with open(manifest_path, "a") as manifest:
+
+        def record(entry, result):
+            entry.update(result)
+            manifest.write(json.dumps(entry) + "\n")
+            manifest.flush()
+            entries.append(entry)
+            if entry["status"] == "failed":
+                logging.error(f"Failed to anonymize {entry['input']}: {entry['error']}")
+
+        if jobs <= 1 or len(pending) <= 1:
+            for entry, skip_columns in pending:
+                result = _anonymize_one(
+                    config, entry["input"], entry["output"], user_callback, skip_columns, metrics
+                )
+                record(entry, result)
+            return entries
+
+        with ProcessPoolExecutor(
+            max_workers=min(jobs, len(pending)),
+            # forking a process that already runs polars' thread pool can deadlock
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(config, dict(FieldTypeFactory.USER_TYPES), user_callback),
+        ) as executor:
+            futures = {
+                executor.submit(
+                    _anonymize_task, entry["input"], entry["output"], skip_columns, metrics
+                ): entry
+                for entry, skip_columns in pending
+            }
+            for future in as_completed(futures):
+                record(futures[future], future.result())
+    return entries
@@ -0,0 +1,58 @@
+"""
+HyperLogLog cardinality estimates computed with polars expressions.
+
+Every value is hashed to 64 bits. The top PRECISION bits pick one of 2**PRECISION registers, and
+each register keeps the highest rank, i.e. the position of the first set bit, among the remaining
+bits of its hashes. A column reduces to at most one (register, rank) code per register and rank, so
+the sketch needs bounded memory however many rows or distinct values a column has. Registers of
+different files merge by taking the maximum, which makes the estimates combinable.
+"""
+
+import math
+
+import polars as pl
+
+PRECISION = 14
+REGISTERS = 2**PRECISION
+# the rank is stored in the low bits of a code, and is at most 64 - PRECISION + 1
+RANK_BITS = 6
+RANK_BITS_VALUE = 2**RANK_BITS
+HASH_SEED = 0
+
+
+def sketch_expression(column: pl.Expr) -> pl.Expr:
+    """The distinct (register, rank) codes of a column's non-null values, as a list."""
+    hashes = column.filter(column.is_not_null()).hash(HASH_SEED)
+    register = hashes // 2 ** (64 - PRECISION)
+    remainder = hashes % 2 ** (64 - PRECISION)
+    rank = remainder.bitwise_leading_zeros().cast(pl.UInt64) - PRECISION + 1
+    return (register * RANK_BITS_VALUE + rank).unique().implode()
+
+
+def registers_from_codes(codes) -> pl.Series:
+    """The register array of a sketch, the highest rank seen per register."""
+    codes = pl.Series(codes, dtype=pl.UInt64)
+    ranks = (
+        pl.DataFrame({"register": codes // RANK_BITS_VALUE, "rank": codes % RANK_BITS_VALUE})
+        .group_by("register")
+        .agg(pl.col("rank").max())
+    )
+    registers = pl.Series("registers", [0] * REGISTERS, dtype=pl.UInt8)
+    if ranks.is_empty():
+        return registers
+    return registers.scatter(ranks["register"], ranks["rank"].cast(pl.UInt8))
+
+
+def merge_registers(*registers: pl.Series) -> pl.Series:
+    """Registers of the union of the sketched columns"""
+    return pl.select(pl.max_horizontal(registers)).to_series().alias("registers")
+
+
+def estimate_cardinality(registers: pl.Series) -> int:
+    """The HyperLogLog estimate, with the linear counting correction for small cardinalities."""
+    alpha = 0.7213 / (1 + 1.079 / REGISTERS)
+    estimate = alpha * REGISTERS**2 / (0.5 ** registers.cast(pl.Float64)).sum()
+    empty_registers = (registers == 0).sum()
+    if estimate <= 2.5 * REGISTERS and empty_registers > 0:
+        estimate = REGISTERS * math.log(REGISTERS / empty_registers)
+    return round(estimate)
@@ -1,15 +1,23 @@
+import json
 import logging
 import click
 import os
+from contextlib import nullcontext
 
-from parquet_anonymizer.config import Config
-from parquet_anonymizer.config_generator import generate_yaml_config
-from parquet_anonymizer.anonymizer import anonymize_csv, anonymize_parquet, anonymize_xlsx
+# The modules doing the actual work import polars, pyarrow and Faker, which take far longer to
+# load than the CLI itself. Commands import them when they run, so --help and argument errors
+# return quickly.
+from parquet_anonymizer.config import (
+    DEFAULT_SAMPLE_ROWS,
+    OPTIONS_THRESHOLD,
+    PARQUET_CODECS,
+    Config,
+)
 from parquet_anonymizer.util import keygen, DEFAULT_KEY_FILE
 
 
 @click.command()
-@click.argument("file", type=click.Path(exists=True))
+@click.argument("files", nargs=-1, required=True)
 @click.option(
     "--has-header", is_flag=True, help="Indicates whether the data file contains a header row."
 )
@@ -18,9 +26,150 @@ from parquet_anonymizer.util import keygen, DEFAULT_KEY_FILE
     default=",",
     help='Only needed for CSV files. The delimiter used in the data file (e.g., ",", "\t").',
 )
-def generate_config(file, has_header, delimiter):
-    """Generates a YAML configuration file based on the provided data file."""
-    generate_yaml_config(file, has_header, delimiter)
+@click.option(
+    "--sample-rows",
+    type=click.IntRange(min=1),
+    default=DEFAULT_SAMPLE_ROWS,
+    show_default=True,
+    help="Number of non-null values sampled per column to infer formats from.",
+)
+@click.option(
+    "--options-threshold",
+    type=click.IntRange(min=1),
+    default=OPTIONS_THRESHOLD,
+    show_default=True,
+    help="Columns with fewer distinct values than this become options columns.",
+)
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    help="Number of processes profiling files in parallel. Defaults to the number of CPUs.",
+)
+@click.option(
+    "--out-file",
+    type=click.Path(dir_okay=False),
+    help="Path to the generated configuration file. Defaults to a name based on the data file.",
+)
+def generate_config(
+    files, has_header, delimiter, sample_rows, options_threshold, workers, out_file
+):
+    """
+    Generates a YAML configuration file based on the provided data files or glob patterns. The
+    profiles of all files are merged into a single configuration.
+    """
+    from parquet_anonymizer.config_generator import generate_yaml_config
+
+    generate_yaml_config(
+        list(files),
+        has_header,
+        delimiter,
+        sample_rows=sample_rows,
+        options_threshold=options_threshold,
+        workers=workers,
+        config_file_name=out_file,
+    )
+
+
+def anonymization_options(func):
+    """Options shared by the commands that anonymize files."""
+    options = [
+        click.option(
+            "--config-file",
+            type=click.Path(exists=True),
+            help="Path to the configuration file.",
+            required=True,
+        ),
+        click.option(
+            "--delimiter", help="Delimiter used in the data file. For CSV files. Defaults to ','."
+        ),
+        click.option(
+            "--streaming",
+            is_flag=True,
+            default=None,
+            help="Process parquet and CSV files in batches to keep memory usage bounded.",
+        ),
+        click.option(
+            "--batch-size",
+            type=click.IntRange(min=1),
+            help="Rows per batch when streaming, and by default rows per row group in parquet "
+            + "output. Defaults to 250000.",
+        ),
+        click.option(
+            "--workers",
+            type=click.IntRange(min=1),
+            help="Number of worker processes used for anonymization. Defaults to 1.",
+        ),
+        click.option(
+            "--vectorized",
+            is_flag=True,
+            default=None,
+            help="Generate values column-at-a-time for field types that support it. Faster, but "
+            + "the anonymized values differ from the default per-value generation. Faker-based "
+            + "types pick from a pool of 10000 sampled values per provider, so a column gets at "
+            + "most that many distinct values unless its pool_size option is raised.",
+        ),
+        click.option(
+            "--passthrough",
+            is_flag=True,
+            default=None,
+            help="For parquet files, only convert the anonymized columns to polars and keep the "
+            + "others as Arrow data, keeping the input's row groups and schema. All columns are "
+            + "still decoded and re-encoded.",
+        ),
+        click.option(
+            "--compression",
+            type=click.Choice(PARQUET_CODECS),
+            help="Compression codec of parquet output. Defaults to zstd.",
+        ),
+        click.option(
+            "--compression-level",
+            type=int,
+            help="Compression level of parquet output, for the codecs that support levels.",
+        ),
+        click.option(
+            "--row-group-size",
+            type=click.IntRange(min=1),
+            help="Rows per row group in parquet output. Defaults to the batch size.",
+        ),
+        click.option(
+            "--statistics/--no-statistics",
+            default=None,
+            help="Whether parquet output has column statistics. Enabled by default.",
+        ),
+        click.option(
+            "--dictionary/--no-dictionary",
+            default=None,
+            help="Whether parquet output uses dictionary encoding. Enabled by default.",
+        ),
+        click.option(
+            "--match-input-layout",
+            is_flag=True,
+            default=None,
+            help="Write parquet output with the input file's codecs, row group size, statistics, "
+            + "dictionary encoding and key-value metadata, unless set by the options above.",
+        ),
+        click.option(
+            "--cache",
+            is_flag=True,
+            default=None,
+            help="Reuse anonymized values across runs through a persistent on-disk cache.",
+        ),
+        click.option(
+            "--cache-dir",
+            type=click.Path(file_okay=False),
+            help="Directory of the persistent cache. Implies --cache. Defaults to "
+            + "~/.cache/parquet_anonymizer.",
+        ),
+        click.option(
+            "--cache-max-size",
+            type=click.IntRange(min=1),
+            help="Size in MB above which the least recently used cache entries are evicted. "
+            + "Defaults to 1024.",
+        ),
+    ]
+    for option in reversed(options):
+        func = option(func)
+    return func
 
 
 @click.command()
@@ -31,27 +180,40 @@ def generate_config(file, has_header, delimiter):
     required=True,
 )
 @click.option("--out-file", type=click.Path(), help="Path to the output file.")
-@click.option(
-    "--config-file",
-    type=click.Path(exists=True),
-    help="Path to the configuration file.",
-    required=True,
-)
-@click.option(
-    "--delimiter", help="Delimiter used in the data file. For CSV files. Defaults to ','."
-)
 @click.option(
     "--key-file",
     type=click.Path(),
     help="Path to the key file to be used for anonymization. If not provided, a random key "
     + "will be generated.",
 )
-def anonymize_file(in_file, out_file, config_file, delimiter, key_file=None):
+@click.option(
+    "--metrics-file",
+    type=click.Path(dir_okay=False),
+    help="Write timings, throughput, value counts, cache hits and memory per stage and column "
+    + "to this JSON file.",
+)
+@click.option(
+    "--profile",
+    type=click.Path(file_okay=False),
+    help="Profile the run and write pstats files and collapsed stacks for flame graphs, per "
+    + "field type and for the rest of the pipeline, to this directory.",
+)
+@anonymization_options
+def anonymize_file(
+    in_file, out_file, config_file, key_file=None, metrics_file=None, profile=None, **options
+):
     """Anonymizes a file using the provided configuration file."""
+    from parquet_anonymizer.anonymizer import SUPPORTED_EXTENSIONS, anonymize_path
+    from parquet_anonymizer.metrics import Metrics
+    from parquet_anonymizer.profiling import Profiler
+
     for path in [in_file, config_file]:
         if not os.path.isfile(path):
             logging.error(f"No such file: {path}")
             return
+    if os.path.splitext(in_file)[1].lower() not in SUPPORTED_EXTENSIONS:
+        logging.error("Unsupported file format. Supported formats are: csv, parquet, xlsx.")
+        return
     if out_file is None:
         out_file = (
             in_file.replace(".csv", "_anonymized.csv")
@@ -63,15 +225,175 @@ def anonymize_file(in_file, out_file, config_file, delimiter, key_file=None):
         key_file = key_dir + DEFAULT_KEY_FILE
         keygen(key_file)
         logging.warning(f"No key file provided. Generating a random key and saving to {key_file}.")
-    config = Config(yaml_path=config_file, key_file_path=key_file, delimiter=delimiter)
-    if in_file.endswith(".csv"):
-        anonymize_csv(config, in_file, out_file)
-    elif in_file.endswith(".parquet"):
-        anonymize_parquet(config, in_file, out_file)
-    elif in_file.endswith(".xlsx"):
-        anonymize_xlsx(config, in_file, out_file)
-    else:
-        logging.error("Unsupported file format. Supported formats are: csv, parquet, xlsx.")
+    config = Config(yaml_path=config_file, key_file_path=key_file, **options)
+    metrics = Metrics(enabled=metrics_file is not None)
+    if profile is not None and config.workers > 1:
+        logging.warning("Field types running in worker processes are not profiled.")
+    with nullcontext() if profile is None else Profiler(profile):
+        report = anonymize_path(config, in_file, out_file, metrics=metrics)
+    if metrics_file is not None:
+        metrics.write(metrics_file, input=in_file, output=out_file)
+    if report:
+        click.echo(", ".join(f"{name}: {value}" for name, value in report.items()))
+
+
+@click.command()
+@click.argument("inputs", nargs=-1, required=True)
+@click.option(
+    "--out-dir",
+    type=click.Path(file_okay=False),
+    help="Directory the anonymized files are written to, keeping their relative paths.",
+    required=True,
+)
+@click.option(
+    "--key-file",
+    type=click.Path(),
+    help="Path to the key file to be used for anonymization. If not provided, the key in the "
+    + "directory containing the inputs is used, or a random one is generated there. It is never "
+    + "put in the output directory, as anyone with the key can re-derive the anonymized values.",
+)
+@click.option(
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=1,
+    help="Number of files anonymized concurrently. Each file can use --workers processes too.",
+)
+@click.option(
+    "--manifest",
+    type=click.Path(dir_okay=False),
+    help="Path to the manifest recording finished files. Defaults to manifest.jsonl in the "
+    + "output directory.",
+)
+@click.option(
+    "--metrics-file",
+    type=click.Path(dir_okay=False),
+    help="Write the timings, throughput, value counts, cache hits and memory of every file to "
+    + "this JSON file.",
+)
+@anonymization_options
+def anonymize_batch(
+    inputs, out_dir, config_file, key_file=None, jobs=1, manifest=None, metrics_file=None, **options
+):
+    """
+    Anonymizes all files in the given directories or matching the given glob patterns. Running
+    the command again resumes an interrupted run, skipping the files that are already done.
+    """
+    from parquet_anonymizer.batch import anonymize_files, input_root
+
+    key_dir = os.path.commonpath([os.path.abspath(input_root(path) or ".") for path in inputs])
+    key_file = _input_key_file(key_file, os.path.join(key_dir, DEFAULT_KEY_FILE), out_dir)
+    config = Config(yaml_path=config_file, key_file_path=key_file, **options)
+    entries = anonymize_files(
+        config,
+        inputs,
+        out_dir,
+        jobs,
+        manifest,
+        metrics=metrics_file is not None,
+        exclude=[key_file],
+    )
+    _write_metrics(metrics_file, entries)
+    _check_entries(entries)
+
+
+@click.command()
+@click.argument("in_dir", type=click.Path(exists=True, file_okay=False))
+@click.option(
+    "--out-dir",
+    type=click.Path(file_okay=False),
+    help="Directory the anonymized dataset is written to, with the same partitioning.",
+    required=True,
+)
+@click.option(
+    "--key-file",
+    type=click.Path(),
+    help="Path to the key file to be used for anonymization. If not provided, the key next to "
+    + "the input directory (<in-dir>_anonymizer.key) is used, or a random one is generated "
+    + "there. It is never put in the output directory.",
+)
+@click.option(
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=1,
+    help="Number of parquet files anonymized concurrently.",
+)
+@click.option(
+    "--manifest",
+    type=click.Path(dir_okay=False),
+    help="Path to the manifest recording finished files. Defaults to <out-dir>_manifest.jsonl.",
+)
+@click.option(
+    "--metrics-file",
+    type=click.Path(dir_okay=False),
+    help="Write the timings, throughput, value counts, cache hits and memory of every file to "
+    + "this JSON file.",
+)
+@anonymization_options
+def anonymize_dataset(
+    in_dir, out_dir, config_file, key_file=None, jobs=1, manifest=None, metrics_file=None, **options
+):
+    """
+    Anonymizes a hive-partitioned directory of parquet files into an identically partitioned
+    directory. Running the command again resumes an interrupted run.
+    """
+    from parquet_anonymizer.batch import anonymize_parquet_dataset, dataset_sidecar_path
+
+    key_file = _input_key_file(key_file, dataset_sidecar_path(in_dir, DEFAULT_KEY_FILE), out_dir)
+    config = Config(yaml_path=config_file, key_file_path=key_file, **options)
+    entries = anonymize_parquet_dataset(
+        config,
+        in_dir,
+        out_dir,
+        jobs,
+        manifest,
+        metrics=metrics_file is not None,
+        exclude=[key_file],
+    )
+    _write_metrics(metrics_file, entries)
+    _check_entries(entries)
+
+
+def _input_key_file(key_file, default_key_file, out_dir):
+    """
+    Reuses or generates the key next to the inputs, so resumed runs use the same key. The key
+    must not end up in the output, whose recipients could re-derive every anonymized value with
+    it, so a key file is required when the default one would be inside the output directory.
+    """
+    from parquet_anonymizer.batch import is_within
+
+    if key_file is None:
+        key_file = default_key_file
+        if is_within(os.path.abspath(key_file), os.path.abspath(out_dir)):
+            raise click.UsageError(
+                "The inputs are inside --out-dir, so a generated key would be written to the "
+                + "output. Pass a --key-file outside of it."
+            )
+        if not os.path.isfile(key_file):
+            os.makedirs(os.path.dirname(os.path.abspath(key_file)), exist_ok=True)
+            keygen(key_file)
+            logging.warning(
+                f"No key file provided. Generating a random key and saving to {key_file}."
+            )
+    return key_file
+
+
+def _write_metrics(metrics_file, entries):
+    """Writes the metrics of the files anonymized by this run, if a metrics file is given."""
+    if metrics_file is None:
+        return
+    files = [
+        {name: entry.get(name) for name in ["input", "output", "status", "metrics"]}
+        for entry in entries
+        if entry["status"] != "skipped"
+    ]
+    with open(metrics_file, "w") as f:
+        json.dump({"files": files}, f, indent=2)
+
+
+def _check_entries(entries):
+    failed = [entry for entry in entries if entry["status"] == "failed"]
+    if failed:
+        raise click.ClickException(f"{len(failed)} of {len(entries)} files failed.")
 
 
 @click.group()
@@ -82,4 +404,6 @@ def cli():
 if __name__ == "__main__":
     cli.add_command(generate_config)
     cli.add_command(anonymize_file)
+    cli.add_command(anonymize_batch)
+    cli.add_command(anonymize_dataset)
     cli()
@@ -1,18 +1,33 @@
 from ruamel.yaml import YAML
 from ruamel.yaml.comments import CommentedMap
 
+DEFAULT_BATCH_SIZE = 250_000
+DEFAULT_CACHE_MAX_SIZE_MB = 1024
+
+PARQUET_CODECS = ("none", "snappy", "gzip", "brotli", "lz4", "zstd")
+DEFAULT_PARQUET_CODEC = "zstd"
+
+# Non-null values sampled per column to infer formats from when generating a config
+DEFAULT_SAMPLE_ROWS = 10_000
+
+# Columns with fewer distinct values than this become Options columns in a generated config
+OPTIONS_THRESHOLD = 500
+
 
 class Config:
     def __init__(self, yaml_path=None, key_file_path=None, **kwargs):
         self.config_dict = CommentedMap()
-        for keyword in kwargs:
-            self.config_dict[keyword] = kwargs[keyword]
         if yaml_path is not None:
             with open(yaml_path) as config_file:
                 yaml = YAML(typ="safe")
                 self.config_dict = yaml.load(config_file)
-        else:
-            self.config_dict["columns_to_anonymize"] = {}
+        # keyword arguments (e.g. from the command line) override the file, unless unset, and
+        # unset ones fall back to the defaults like missing keys
+        kwargs = {keyword: value for keyword, value in kwargs.items() if value is not None}
+        for keyword in kwargs:
+            self.config_dict[keyword] = kwargs[keyword]
+        if yaml_path is None:
+            self.config_dict["columns_to_anonymize"] = CommentedMap()
         if key_file_path is not None:
             with open(key_file_path) as key_file:
                 self.secret_key = key_file.read().strip()
@@ -23,7 +38,63 @@ class Config:
 
     @property
     def delimiter(self):
-        return self.config_dict.get("delimiter")
+        return self.config_dict.get("delimiter", ",")
+
+    @property
+    def streaming(self):
+        return bool(self.config_dict.get("streaming", False))
+
+    @property
+    def batch_size(self):
+        return int(self.config_dict.get("batch_size", DEFAULT_BATCH_SIZE))
+
+    @property
+    def workers(self):
+        return int(self.config_dict.get("workers", 1))
+
+    @property
+    def vectorized(self):
+        return bool(self.config_dict.get("vectorized", False))
+
+    @property
+    def passthrough(self):
+        return bool(self.config_dict.get("passthrough", False))
+
+    @property
+    def compression(self):
+        return self.config_dict.get("compression")
+
+    @property
+    def compression_level(self):
+        return self.config_dict.get("compression_level")
+
+    @property
+    def row_group_size(self):
+        return self.config_dict.get("row_group_size")
+
+    @property
+    def statistics(self):
+        return self.config_dict.get("statistics")
+
+    @property
+    def dictionary(self):
+        return self.config_dict.get("dictionary")
+
+    @property
+    def match_input_layout(self):
+        return bool(self.config_dict.get("match_input_layout", False))
+
+    @property
+    def cache(self):
+        return bool(self.config_dict.get("cache", False)) or self.cache_dir is not None
+
+    @property
+    def cache_dir(self):
+        return self.config_dict.get("cache_dir")
+
+    @property
+    def cache_max_size(self):
+        return int(self.config_dict.get("cache_max_size", DEFAULT_CACHE_MAX_SIZE_MB))
 
     def add_column_config(self, column_name, column_config_dict):
         self.config_dict["columns_to_anonymize"][column_name] = column_config_dict
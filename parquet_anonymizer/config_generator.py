@@ -1,210 +1,578 @@
+import glob
 import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
 import logging
 import polars as pl
-import dateutil.parser as date_parser
 
-from .config import Config
-from memory_profiler import profile
-
-# TODO: optimize
-
-mem_logs = open("memory_profiler.log", "w")
-
-
-def generate_yaml_config(data_file, has_header, delimiter, enableOptions=True):
+from .cardinality import (
+    estimate_cardinality,
+    merge_registers,
+    registers_from_codes,
+    sketch_expression,
+)
+from .config import DEFAULT_BATCH_SIZE, DEFAULT_SAMPLE_ROWS, OPTIONS_THRESHOLD, Config
+
+# Columns whose estimated cardinality is below OPTIONS_THRESHOLD times this factor have their
+# distinct values collected exactly, which leaves a wide margin for the estimate's error
+CARDINALITY_MARGIN = 1.25
+
+# Formats tried on the sample of text columns, in order of preference. Each is valid for both
+# polars' parser and Python's strptime, which DateTimeField uses for the range dates.
+DATE_FORMATS = [
+    "%Y-%m-%d",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y/%m/%d",
+    "%Y%m%d",
+    "%m/%d/%Y",
+    "%d/%m/%Y",
+    "%m/%d/%Y %H:%M:%S",
+    "%d/%m/%Y %H:%M:%S",
+    "%m-%d-%Y",
+    "%d-%m-%Y",
+    "%d.%m.%Y",
+    "%d %b %Y",
+    "%b %d, %Y",
+    "%d %B %Y",
+    "%B %d, %Y",
+]
+
+# Format used for date and datetime columns, whose values need no parsing
+DEFAULT_DATE_FORMAT = "%Y-%m-%d"
+
+# Share of a text column's sampled values a format must parse for the column to be a date column
+DATE_MATCH_THRESHOLD = 0.9
+
+ROW_INDEX_COLUMN = "__row_index"
+SAMPLE_SEED = 0
+
+
+def generate_yaml_config(
+    data_file,
+    has_header,
+    delimiter,
+    enableOptions=True,
+    sample_rows=DEFAULT_SAMPLE_ROWS,
+    options_threshold=OPTIONS_THRESHOLD,
+    workers=None,
+    config_file_name=None,
+):
     """
-    Generates a YAML configuration file based on the provided data file.
+    Generates a YAML configuration file based on the provided data file or files.
 
     Args:
-        data_file (str): Path to the data file to be used for generating the configuration.
+        data_file (str or list): Path to the data file to be used for generating the
+        configuration, or a list of paths and glob patterns of files sharing one schema.
         has_header (bool): Indicates whether the data file contains a header row.
         delimiter (str): The delimiter used in the data file (e.g., ',', '\t').
         enableOptions (bool, optional): Flag to enable or disable additional options.
         Defaults to True.
+        sample_rows (int, optional): Number of non-null values sampled per column to infer
+        formats from. Defaults to 10000.
+        options_threshold (int, optional): Columns with fewer distinct values become Options
+        columns. Defaults to 500.
+        workers (int, optional): Number of processes profiling files in parallel. Defaults to
+        the number of CPUs.
+        config_file_name (str, optional): Where to save the configuration. Defaults to a name
+        based on the data file's name, see below.
 
     Returns:
         None
 
-    The function builds a data dictionary from the provided data file, determines the best
-    configuration for each column, and saves the generated configuration to a YAML file. The
-    generated configuration file is saved in the same directory as the data file with a name based
-    on the data file's name.
+    The function profiles the columns of the provided data files, merges the profiles of all
+    files, determines the best configuration for each column, and saves the generated
+    configuration to a YAML file. For a single data file, the generated configuration file is
+    saved in the same directory as the data file with a name based on the data file's name.
+    For several, it is saved as generated-config.yml in their common directory. Each column is
+    commented with its estimated number of distinct values, to help tune the Options threshold.
     """
-    data_dict = build_data_dictionary(data_file, has_header, delimiter)
+    data_files = find_data_files([data_file] if isinstance(data_file, str) else data_file)
+    if not data_files:
+        raise ValueError(f"No data files found for: {data_file}")
+    profiles = profile_data_files(
+        data_files, has_header, delimiter, sample_rows, options_threshold, workers
+    )
     new_config = Config(delimiter=delimiter)
-    for column in data_dict:
+    for column in profiles:
         column_config = get_best_column_config_for_column(
-            data_dict[column], enableOptions=enableOptions
+            profiles[column], enableOptions=enableOptions, options_threshold=options_threshold
         )
         if column_config is None:
             continue
         new_config.add_column_config(column, column_config)
+        new_config.columns_to_anonymize.yaml_add_eol_comment(
+            f"estimated distinct values: {profiles[column]['cardinality']}", column
+        )
+    if config_file_name is None:
+        config_file_name = get_config_file_name(data_files)
+    get_logger().info(f"Saving generated config file to: {config_file_name}")
+    new_config.save_config(save_name=config_file_name)
+
+
+def get_config_file_name(data_files):
+    if len(data_files) > 1:
+        return os.path.join(os.path.commonpath(data_files), "generated-config.yml")
+    data_file = data_files[0]
     if os.path.dirname(data_file) != "":
         data_file_path = os.path.dirname(data_file) + "/"
         file_base_name = os.path.splitext(os.path.basename(data_file))[0]
-        config_file_name = "{}generated-{}-config.yml".format(data_file_path, file_base_name)
+        return "{}generated-{}-config.yml".format(data_file_path, file_base_name)
+    return "generated-{}-config.yml".format(data_file)
+
+
+def find_data_files(patterns):
+    """Expands glob patterns, returning the matched files sorted and without duplicates."""
+    data_files = set()
+    for pattern in patterns:
+        if glob.has_magic(pattern):
+            data_files.update(
+                path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path)
+            )
+        else:
+            data_files.add(pattern)
+    return sorted(data_files)
+
+
+def profile_data_files(
+    data_files,
+    has_header=True,
+    delimiter=",",
+    sample_rows=DEFAULT_SAMPLE_ROWS,
+    options_threshold=OPTIONS_THRESHOLD,
+    workers=None,
+):
+    """
+    Profiles each data file with build_column_profiles, on up to `workers` processes, and merges
+    the profiles into one per column.
+    """
+    workers = min(workers or os.cpu_count() or 1, len(data_files))
+    arguments = [
+        (data_file, has_header, delimiter, sample_rows, options_threshold)
+        for data_file in data_files
+    ]
+    if workers <= 1:
+        file_profiles = [build_column_profiles(*file_arguments) for file_arguments in arguments]
     else:
-        config_file_name = "generated-{}-config.yml".format(data_file)
-    get_logger().info(f"Saving generated config file to: {config_file_name}")
-    new_config.save_config(save_name=config_file_name)
+        # forking a process that already runs polars' thread pool can deadlock
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            file_profiles = list(executor.map(build_column_profiles, *zip(*arguments)))
+    if len(file_profiles) == 1:
+        return file_profiles[0]
+    columns = {}
+    for profiles in file_profiles:
+        for name, profile in profiles.items():
+            columns.setdefault(name, []).append(profile)
+    return {
+        name: merge_column_profiles(profiles, sample_rows, options_threshold)
+        for name, profiles in columns.items()
+    }
+
+
+def merge_column_profiles(
+    profiles, sample_rows=DEFAULT_SAMPLE_ROWS, options_threshold=OPTIONS_THRESHOLD
+):
+    """
+    Merges the profiles of one column in several files: counts are summed, min/max and date
+    ranges widened, Options values united and the HyperLogLog registers merged. The samples are
+    combined in proportion to each file's number of non-null values.
+    """
+    dtypes = {profile["dtype"] for profile in profiles}
+    same_dtype = len(dtypes) == 1
+    # columns typed differently in some files are treated as text
+    dtype = dtypes.pop() if same_dtype else pl.Utf8
+    merged = {
+        "dtype": dtype,
+        "count": sum(profile["count"] for profile in profiles),
+        "null_count": sum(profile["null_count"] for profile in profiles),
+        "first_value": next(
+            (profile["first_value"] for profile in profiles if profile["first_value"] is not None),
+            None,
+        ),
+        "registers": merge_registers(*(profile["registers"] for profile in profiles)),
+    }
+    merged["cardinality"] = estimate_cardinality(merged["registers"]) + int(
+        merged["null_count"] > 0
+    )
+    for bound, combine in (("min", min), ("max", max)):
+        values = [profile[bound] for profile in profiles if profile[bound] is not None]
+        merged[bound] = combine(values) if values and same_dtype else None
+
+    merged["uniques"] = None
+    if all(profile["uniques"] is not None for profile in profiles):
+        uniques = {}
+        for profile in profiles:
+            uniques.update(dict.fromkeys(profile["uniques"]))
+        merged["uniques"] = list(uniques)[:options_threshold]
+
+    non_null_counts = [profile["count"] - profile["null_count"] for profile in profiles]
+    total = sum(non_null_counts)
+    # each file's sample is in random order, so any head of it is a uniform sample as well
+    merged["sample"] = pl.concat(
+        [
+            profile["sample"].cast(dtype).head(round(sample_rows * non_null / total))
+            for profile, non_null in zip(profiles, non_null_counts)
+        ]
+        if total
+        else [pl.Series(profiles[0]["sample"].name, [], dtype=dtype)]
+    )
+
+    merged["date_format"] = merged["date_min"] = merged["date_max"] = None
+    if dtype == pl.Utf8:
+        detected = detect_date_format(merged["sample"])
+        if detected is not None:
+            date_format = detected[0]
+            date_profiles = [
+                profile
+                for profile in profiles
+                if profile["date_format"] == date_format and profile["date_min"] is not None
+            ]
+            if date_profiles:
+                merged["date_format"] = date_format
+                merged["date_min"] = min(profile["date_min"] for profile in date_profiles)
+                merged["date_max"] = max(profile["date_max"] for profile in date_profiles)
+    return merged
 
 
 def get_logger():
     return logging.getLogger("config_generator")
 
 
-@profile(stream=mem_logs)
-def build_data_dictionary(data_file, has_header=True, delimiter=","):
+def read_data_batches(data_file, has_header=True, delimiter=",", batch_size=DEFAULT_BATCH_SIZE):
     """
-    Builds a dictionary where the keys are the columns in the file, and the values are lists of
-    that column's values.
-
-    Args:
-        data_file (str): The path to the data file.
-        has_header (bool, optional): Whether the file has a header row. Defaults to True.
-        delimiter (str, optional): The delimiter used in the file. Defaults to ",".
-
-    Returns:
-        dict: A dictionary with column names as keys and lists of column values as values.
+    Yields the rows of the data file in dataframes of about `batch_size` rows, so that profiling
+    only ever holds one batch in memory. Excel files can't be read in batches and are read whole.
+    Without a header the columns are named "0", "1", ...
 
     Raises:
         ValueError: If the file format is unsupported.
     """
+    from .anonymizer import read_csv_batches, read_parquet_batches
+
     file_extension = data_file.split(".")[-1].lower()
 
     if file_extension == "csv":
-        df = pl.read_csv(data_file, has_header=has_header, separator=delimiter)
+        batches = read_csv_batches(data_file, delimiter, batch_size, has_header=has_header)
     elif file_extension in ["xlsx", "xls"]:
-        df = pl.read_excel(data_file, read_csv_options={"has_header": has_header})
+        batches = [pl.read_excel(data_file, has_header=has_header)]
     elif file_extension == "parquet":
-        df = pl.read_parquet(data_file)
+        batches = read_parquet_batches(data_file, batch_size)
     else:
         raise ValueError(
             f"Unsupported file format: {file_extension}. Supported formats are: csv, xlsx, parquet."
         )
 
-    if not has_header:
-        df.columns = [str(i) for i in range(len(df.columns))]
+    for batch in batches:
+        if not has_header:
+            batch = batch.rename({name: str(i) for i, name in enumerate(batch.columns)})
+        yield batch
 
-    # TODO: look into optimizing this dict on memory efficiency
-    return {col: df[col].to_list() for col in df.columns}  
 
+def build_column_profiles(
+    data_file,
+    has_header=True,
+    delimiter=",",
+    sample_rows=DEFAULT_SAMPLE_ROWS,
+    options_threshold=OPTIONS_THRESHOLD,
+    batch_size=DEFAULT_BATCH_SIZE,
+):
+    """
+    Profiles every column of the data file, reading it `batch_size` rows at a time, so memory
+    use depends on the batch size rather than the file size. Each batch is profiled in a single
+    native pass and combined with the batches before it: counts are summed, min/max widened and
+    the HyperLogLog sketches estimating each column's cardinality merged. The distinct values of
+    the columns estimated to be near or below the Options threshold are collected exactly. A
+    second pass over the batches finds the full date range of text columns whose sample parses
+    as dates.
 
-def get_best_column_config_for_column(column_values, enableOptions=True):
+    Args:
+        data_file (str): The path to the data file.
+        has_header (bool, optional): Whether the file has a header row. Defaults to True.
+        delimiter (str, optional): The delimiter used in the file. Defaults to ",".
+        sample_rows (int, optional): The size of each column's sample. Defaults to 10000.
+        options_threshold (int, optional): Distinct values are collected up to this many.
+        Defaults to 500.
+        batch_size (int, optional): Rows read at a time. Defaults to 250000.
+
+    Returns:
+        dict: Column names mapped to profiles, dicts with the column's `dtype`, row `count`,
+        `null_count`, `min` and `max`, `first_value` (the first non-null value), `registers`
+        (the HyperLogLog registers of the non-null values), `cardinality` (the estimated number
+        of distinct values, counting null as a value), `uniques` (the distinct values in order of
+        appearance, up to the Options threshold, or None when the column was estimated to have
+        too many), `sample` (a uniform random sample of non-null values) and for text columns
+        with dates `date_format`, `date_min` and `date_max`.
+
+    Raises:
+        ValueError: If the file format is unsupported.
+    """
+    profiles = None
+    row_count = 0
+    for batch in read_data_batches(data_file, has_header, delimiter, batch_size):
+        batch_profiles = _profile_batch(batch, row_count, sample_rows, options_threshold, profiles)
+        row_count += len(batch)
+        if profiles is None:
+            profiles = batch_profiles
+            continue
+        for name, profile in profiles.items():
+            _combine_batch_profile(profile, batch_profiles[name], sample_rows, options_threshold)
+
+    date_columns = {}
+    for name, profile in profiles.items():
+        profile["count"] = row_count
+        profile["sample"] = profile.pop("sample_frame").get_column("value").alias(name)
+        profile["cardinality"] = estimate_cardinality(profile["registers"]) + int(
+            profile["null_count"] > 0
+        )
+        if profile["cardinality"] >= options_threshold * CARDINALITY_MARGIN:
+            profile["uniques"] = None
+        profile["date_format"] = profile["date_min"] = profile["date_max"] = None
+        if profile["dtype"] == pl.Utf8:
+            detected = detect_date_format(profile["sample"])
+            if detected is not None:
+                profile["date_format"] = detected[0]
+                date_columns[name] = detected
+
+    if date_columns:
+        for batch in read_data_batches(data_file, has_header, delimiter, batch_size):
+            dates = batch.select(
+                pl.struct(
+                    date_min=parse_dates(pl.col(name), date_format, exact).min(),
+                    date_max=parse_dates(pl.col(name), date_format, exact).max(),
+                ).alias(name)
+                for name, (date_format, exact) in date_columns.items()
+            ).row(0, named=True)
+            for name, result in dates.items():
+                _widen(
+                    profiles[name], "date_min", "date_max", result["date_min"], result["date_max"]
+                )
+    return profiles
+
+
+def _profile_batch(batch: pl.DataFrame, offset, sample_rows, options_threshold, profiles=None):
+    """
+    Profiles one batch of rows starting at row `offset` of the file. Distinct values are only
+    collected while the batches before, in `profiles`, leave the column an Options candidate.
     """
-    Determines the best configuration for a given column based on its values.
+    row = (
+        batch.lazy()
+        .with_row_index(ROW_INDEX_COLUMN, offset=offset)
+        .select(
+            _profile_expression(
+                name,
+                dtype,
+                sample_rows,
+                options_threshold
+                if profiles is None or _collects_uniques(profiles[name], options_threshold)
+                else None,
+            )
+            for name, dtype in batch.schema.items()
+        )
+        .collect()
+    )
+    batch_profiles = {}
+    for name, dtype in batch.schema.items():
+        column = row.get_column(name).struct.unnest()
+        profile = column.drop("sample").row(0, named=True)
+        profile["dtype"] = dtype
+        profile["registers"] = registers_from_codes(profile.pop("sketch"))
+        # the sampled values, along with the hashes of their row numbers they were chosen by
+        profile["sample_frame"] = column.get_column("sample").explode().struct.unnest()
+        if profile["sample_frame"].is_empty():
+            profile["sample_frame"] = pl.DataFrame(schema={"value": dtype, "key": pl.UInt64})
+        batch_profiles[name] = profile
+    return batch_profiles
+
+
+def _collects_uniques(profile, options_threshold):
+    return (
+        profile["uniques"] is not None
+        and len(profile["uniques"]) < options_threshold
+        and estimate_cardinality(profile["registers"]) < options_threshold * CARDINALITY_MARGIN
+    )
+
+
+def _combine_batch_profile(profile, batch_profile, sample_rows, options_threshold):
+    """Adds the profile of a column's next batch of rows to the profile of the rows before."""
+    profile["null_count"] += batch_profile["null_count"]
+    if profile["first_value"] is None:
+        profile["first_value"] = batch_profile["first_value"]
+    _widen(profile, "min", "max", batch_profile["min"], batch_profile["max"])
+    profile["registers"] = merge_registers(profile["registers"], batch_profile["registers"])
+    # the values with the lowest hashed row numbers of the whole file so far
+    profile["sample_frame"] = pl.concat(
+        [profile["sample_frame"], batch_profile["sample_frame"]]
+    ).bottom_k(sample_rows, by="key")
+    if batch_profile["uniques"] is not None:
+        uniques = dict.fromkeys(profile["uniques"])
+        uniques.update(dict.fromkeys(batch_profile["uniques"]))
+        profile["uniques"] = list(uniques)[:options_threshold]
+    elif profile["uniques"] is not None and len(profile["uniques"]) < options_threshold:
+        # collection stopped because the column has too many distinct values
+        profile["uniques"] = None
+
+
+def _widen(profile, min_key, max_key, low, high):
+    """Widens the profile's range between `min_key` and `max_key` to include low and high"""
+    if low is not None and (profile[min_key] is None or low < profile[min_key]):
+        profile[min_key] = low
+    if high is not None and (profile[max_key] is None or high > profile[max_key]):
+        profile[max_key] = high
+
+
+def parse_dates(values, date_format, exact=True):
+    """
+    Parses a text Series or expression with the format, unparsable values become null. Unless
+    `exact`, only the start of each value as long as the format's output is parsed.
+    """
+    if not exact:
+        values = values.str.slice(0, len(datetime(2000, 12, 31, 23, 59, 59).strftime(date_format)))
+    return values.str.to_datetime(date_format, strict=False)
+
+
+def detect_date_format(sample: pl.Series):
+    """
+    Finds the candidate format from DATE_FORMATS that parses the largest share of the sample.
+    Formats are first matched against whole values, then, only if none of them parses enough of
+    the sample, against the start of the values, e.g. "%Y-%m-%d" for ISO timestamps with
+    fractional seconds.
+
+    :param sample (pl.Series): Non-null values of a text column
+    :return: tuple: The format and whether it matches whole values, or None if no format parses
+    at least DATE_MATCH_THRESHOLD of the sample
+    """
+    if sample.is_empty():
+        return
+    for exact in (True, False):
+        match_rates = {}
+        for date_format in DATE_FORMATS:
+            parsed = parse_dates(sample, date_format, exact)
+            match_rates[date_format] = 1 - parsed.null_count() / len(sample)
+        best_format = max(DATE_FORMATS, key=lambda date_format: match_rates[date_format])
+        if match_rates[best_format] >= DATE_MATCH_THRESHOLD:
+            return best_format, exact
+
+
+def _profile_expression(name, dtype, sample_rows, options_threshold=None):
+    column = pl.col(name)
+    orderable = dtype.is_numeric() or dtype.is_temporal() or dtype in (pl.Utf8, pl.Boolean)
+    not_null = column.is_not_null()
+    sample_keys = pl.col(ROW_INDEX_COLUMN).filter(not_null).hash(SAMPLE_SEED)
+    return pl.struct(
+        null_count=column.null_count(),
+        sketch=sketch_expression(column),
+        min=column.min() if orderable else pl.lit(None),
+        max=column.max() if orderable else pl.lit(None),
+        first_value=column.drop_nulls().first(),
+        # at most `options_threshold` values, enough to tell whether there are fewer
+        uniques=column.drop_nulls().unique(maintain_order=True).head(options_threshold).implode()
+        if options_threshold is not None
+        else pl.lit(None),
+        # the non-null values with the lowest hashed row numbers: a uniform sample, like a
+        # reservoir sample, that never holds more than `sample_rows` values per column
+        sample=pl.struct(value=column.filter(not_null), key=sample_keys)
+        .bottom_k_by(sample_keys, sample_rows)
+        .implode(),
+    ).alias(name)
+
+
+def get_best_column_config_for_column(
+    profile, enableOptions=True, options_threshold=OPTIONS_THRESHOLD
+):
+    """
+    Determines the best configuration for a given column based on its profile.
 
-    This function evaluates the column values and returns the most appropriate
+    This function evaluates the column profile and returns the most appropriate
     configuration. It first checks if the column contains date/time values and
     returns the corresponding configuration if found. If not, and if the
     `enableOptions` flag is set to True, it checks if the column has fewer than
-    five hundred unique values and returns an options-based configuration. If
-    neither condition is met, it returns a default custom configuration.
+    `options_threshold` unique values and returns an options-based configuration.
+    If neither condition is met, it returns a default custom configuration.
 
     Args:
-        column_values (list): A list of values in the column to be evaluated.
+        profile (dict): The column's profile, as built by build_column_profiles.
         enableOptions (bool, optional): A flag to enable or disable the options
                                         configuration check. Defaults to True.
+        options_threshold (int, optional): The number of unique values from which
+                                           a column is no longer an Options column.
+                                           Defaults to 500.
 
     Returns:
         dict: The configuration for the column, or None if the column is empty.
     """
-    if len(column_values) == 0:
+    if profile["count"] == 0:
         return
-    column_config = get_date_time_config_if_dates_found(column_values)
+    column_config = get_date_time_config_if_dates_found(profile)
     if column_config:
         return column_config
     if enableOptions:
-        column_config = get_options_config_if_fewer_than_five_hundred(column_values)
+        column_config = get_options_config_if_few_uniques(profile, options_threshold)
     if column_config:
         return column_config
-    return get_default_custom_column_config(column_values)
+    return get_default_custom_column_config(profile)
 
 
-def get_date_time_config_if_dates_found(column_values):
+def get_date_time_config_if_dates_found(profile):
     """
-    If the values in the column look like dates, return a datetime column configuration
-    in the range of all the dates found in the column.
-    :param column_values: list: A list of column values
-    :return: dict: A dictionary containing the type of configuration and the date range
+    If the column holds dates, return a datetime column configuration in the range of all the
+    dates found in the column. Text columns use the format detected from their sample.
+    :param profile: dict: The column's profile
+    :return: dict: A dictionary containing the type of configuration, the format and the date
+    range
     """
-    sample_value: str = column_values.pop(0)
-    while sample_value is None and len(column_values) > 0:
-        sample_value = column_values.pop(0)
-    if sample_value is None:
-        return
-    match = get_matched_date(sample_value)
-    if match is not None:
-        column_values.append(sample_value)
-        min_date = None
-        max_date = None
-        for value in column_values:
-            matched_date = get_matched_date(value)
-            if matched_date is not None:
-                if min_date is None or matched_date < min_date:
-                    min_date = matched_date
-                if max_date is None or matched_date > max_date:
-                    max_date = matched_date
-        return {
-            "type": "datetime",
-            "format": "%Y-%m-%d",
-            "range_start_date": min_date.strftime("%Y-%m-%d"),
-            "range_end_date": max_date.strftime("%Y-%m-%d"),
-        }
-
-
-def get_matched_date(value):
-    """
-    Parses a date string and returns a datetime object if the string is a valid date.
-
-    :param value (str): The date string to be parsed.
-    :return datetime.datetime or None: A datetime object if the string is a valid date,
-                                   None if the string is too short or cannot be parsed.
-    """
-    if len(str(value)) < 6:
+    if profile["dtype"] in (pl.Date, pl.Datetime):
+        date_format = DEFAULT_DATE_FORMAT
+        min_date, max_date = profile["min"], profile["max"]
+    elif profile["date_format"] is not None:
+        date_format = profile["date_format"]
+        min_date, max_date = profile["date_min"], profile["date_max"]
+    else:
         return
-    try:
-        return date_parser.parse(str(value))
-    except ValueError:
+    if min_date is None:
         return
-    except OverflowError:
-        get_logger().debug("Got overflow error trying to match %s", value)
+    return {
+        "type": "datetime",
+        "format": date_format,
+        "range_start_date": min_date.strftime(date_format),
+        "range_end_date": max_date.strftime(date_format),
+    }
 
 
-def get_options_config_if_fewer_than_five_hundred(column_values):
+def get_options_config_if_few_uniques(profile, options_threshold=OPTIONS_THRESHOLD):
     """
-    If there are fewer than 500 unique values for a column, return an Options configuration dict
-    :param column_values (list): A list of column values
+    If there are fewer than `options_threshold` unique values for a column, return an Options
+    configuration dict
+    :param profile (dict): The column's profile
+    :param options_threshold (int): The number of unique values from which no Options
+    configuration is returned
     :return: dict: A dictionary containing the type of configuration and the unique values
     """
-    unique_dict = {}
-    for value in column_values:
-        unique_dict[value] = True
-    uniques = list(unique_dict.keys())
-    if len(unique_dict.values()) < 500:
+    uniques = profile["uniques"]
+    if uniques is not None and len(uniques) < options_threshold:
         return {"type": "options", "options": uniques}
 
 
-def get_default_custom_column_config(column_values):
+def get_default_custom_column_config(profile):
     """
-    Generate a default custom column configuration based on the sample values provided.
+    Generate a default custom column configuration based on the column's profile.
 
-    Takes a list of column values, extracts the first non-None value, and generates a
-    format string where alphabetic characters are replaced with '?', numeric characters are
-    replaced with '#', and other characters remain unchanged. If all values are None, a default
-    format string "????" is returned.
+    Takes the first non-None value of the column, and generates a format string where
+    alphabetic characters are replaced with '?', numeric characters are replaced with '#', and
+    other characters remain unchanged. If all values are None, a default format string "????" is
+    returned.
 
-    :param column_values (list): A list of column values from which to derive the format string.
+    :param profile (dict): The column's profile, from which to derive the format string.
     :return: dict: A dictionary containing the type of configuration and the generated format string
     """
-    sample_value: str = str(column_values.pop(0))
-    while sample_value is None and len(column_values) > 0:
-        sample_value = str(column_values.pop(0))
+    sample_value = profile["first_value"]
     if sample_value is None:
         format_string = "????"
     else:
         format_string = ""
-        for char in sample_value:
+        for char in str(sample_value):
             if char.isalpha():
                 format_string += "?"
             elif char.isnumeric():
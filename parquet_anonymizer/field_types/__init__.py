@@ -1,9 +1,12 @@
 import logging
 import xxhash
-import faker
+import polars as pl
 
 
 class BaseFieldType:
+    # Set by field types that implement generate_obfuscated_series natively
+    VECTORIZED = False
+
     def __init__(self, type_config_dict):
         self.type_config_dict = type_config_dict
         self.faker = FakerSingleton()
@@ -17,33 +20,114 @@ class BaseFieldType:
         value = xxhash.xxh64(combination.encode()).hexdigest()
         return value
 
+    @staticmethod
+    def keyed_hash(key, series: pl.Series, stream=0) -> pl.Series:
+        """
+        Hashes the text of every value in one native call to polars' hash, seeded from the secret
+        key, the polars version and `stream`, so each stream is an independent keyed hash. Nulls
+        stay null.
+
+        Polars only guarantees its hash within a version. Rather than fall back to hashing value
+        by value in Python with a fixed algorithm, the version is part of the seed: the hashes are
+        as fast as polars can make them and the same for every run on one polars version, but
+        all of them change when polars is upgraded. Pin polars to keep pseudonyms reproducible.
+        """
+        hash_seeds = [
+            xxhash.xxh64_intdigest(f"{pl.__version__}|{key}".encode(), seed=4 * stream + i)
+            for i in range(4)
+        ]
+        values = series.cast(pl.Utf8)
+        hashes = values.hash(*hash_seeds)
+        if values.has_nulls():
+            hashes = pl.select(pl.when(values.is_not_null()).then(hashes)).to_series()
+        return hashes.alias(series.name)
+
+    @staticmethod
+    def generate_seeds(key, series: pl.Series) -> pl.Series:
+        """
+        Batch counterpart of generate_seed: a UInt64 column of keyed_hash seeds, one per value, so
+        the values are the same for a given secret key and polars version.
+        """
+        return BaseFieldType.keyed_hash(key, series)
+
+    @staticmethod
+    def derive_seeds(seeds: pl.Series, stream: int) -> pl.Series:
+        """
+        Derives an independent column of seeds, so that a field type can draw several random
+        values (e.g. one per masked digit) from a single seed per row. Uses the SplitMix64 mixer
+        on Arrow's wrapping integer arithmetic.
+        """
+        if stream == 0:
+            return seeds
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        def constant(value):
+            return pa.scalar(value, pa.uint64())
+
+        mixed = pc.add(seeds.to_arrow(), constant(stream * 0x9E3779B97F4A7C15 % 2**64))
+        for shift, multiplier in ((30, 0xBF58476D1CE4E5B9), (27, 0x94D049BB133111EB)):
+            mixed = pc.bit_wise_xor(mixed, pc.shift_right(mixed, constant(shift)))
+            mixed = pc.multiply(mixed, constant(multiplier))
+        mixed = pc.bit_wise_xor(mixed, pc.shift_right(mixed, constant(31)))
+        return pl.Series(seeds.name, mixed, dtype=pl.UInt64)
+
     @staticmethod
     def get_logger():
         return logging.getLogger("config_field")
 
     def seed_faker(self, key, field_value):
+        import faker
+
         seed = BaseFieldType.generate_seed(key, field_value)
         faker.Faker.seed(seed)
 
     def generate_obfuscated_value(self, key, value, *args, **kwargs):
         raise NotImplementedError
 
+    def generate_obfuscated_series(self, key, series: pl.Series) -> pl.Series:
+        """
+        Array-at-a-time counterpart of generate_obfuscated_value for field types that set
+        VECTORIZED. Receives the distinct non-null values of a column and builds every output
+        from generate_seeds instead of seeding Faker per value.
+        """
+        raise NotImplementedError
+
+    def pool_size(self):
+        """
+        The number of values in the pool the vectorized output is picked from, which caps the
+        distinct anonymized values of a column, or None if it isn't picked from a single pool.
+        """
+        return None
+
+    def cast_output(self, anonymized: pl.Series) -> pl.Series:
+        """Lets a field type change the dtype of a column's anonymized values, e.g. to Enum"""
+        return anonymized
+
 
 class FakerSingleton:
     """
     Using the singleton pattern since we only need the one instance of Faker,
-    and instantiating Faker is expensive (~0.02 seconds)
+    and instantiating Faker is expensive (~0.02 seconds). Faker is imported and
+    instantiated on first use, so field types that never call it don't pay for it.
     """
 
     class __FakerSingleton:
         def __init__(self, *args, **kwargs):
+            import faker
+
             self.faker = faker.Faker(*args, **kwargs)
 
     instance = None
 
     def __init__(self, *args, **kwargs):
-        if not FakerSingleton.instance:
-            FakerSingleton.instance = FakerSingleton.__FakerSingleton(*args, **kwargs)
+        self.args = args
+        self.kwargs = kwargs
 
     def __getattr__(self, item):
+        if item.startswith("__") or item in ("args", "kwargs"):
+            # not set yet, e.g. while copying or unpickling
+            raise AttributeError(item)
+        if not FakerSingleton.instance:
+            FakerSingleton.instance = FakerSingleton.__FakerSingleton(*self.args, **self.kwargs)
         return getattr(self.instance.faker, item)
@@ -1,9 +1,11 @@
-from . import BaseFieldType
 from .decorators import apply_formatting_options
 from .decorators.apply_user_callback import apply_user_callback
+from .provider_pools import PooledFieldType
 
 
-class CurrencySymbol(BaseFieldType):
+class CurrencySymbol(PooledFieldType):
+    PROVIDER = "currency_code"
+
     @apply_formatting_options
     @apply_user_callback
     def generate_obfuscated_value(self, key, value, *args, **kwargs):
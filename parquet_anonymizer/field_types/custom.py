@@ -1,15 +1,22 @@
+import polars as pl
+
 from . import BaseFieldType
 from .decorators.apply_user_callback import apply_user_callback
-from .decorators.text_formatter import apply_formatting_options
+from .decorators.text_formatter import apply_formatting_options, format_series
+from .format_compiler import CompiledFormat
+from .provider_pools import get_pool_size
 
 
 class Custom(BaseFieldType):
+    VECTORIZED = True
+
     def __init__(self, type_config_dict):
         super().__init__(type_config_dict)
         format_string = type_config_dict.get("format")
         if not format_string or not isinstance(format_string, str):
             raise ValueError("Custom field types must have a format defined of type string")
         self.format = type_config_dict["format"]
+        self.compiled_format = CompiledFormat(self.format)
 
     @apply_formatting_options
     @apply_user_callback
@@ -17,6 +24,15 @@ class Custom(BaseFieldType):
         self.seed_faker(key, value)
         retval = self.faker.bothify(self.format)
         # check if format_string contains only #, if so, return a number
-        if all([c == "#" for c in self.format]):
+        if self.compiled_format.is_integer:
             return int(retval)
         return retval
+
+    def generate_obfuscated_series(self, key, series: pl.Series) -> pl.Series:
+        seeds = self.generate_seeds(key, series)
+        result = self.compiled_format.render(
+            seeds, self.faker.locales, get_pool_size(self.type_config_dict)
+        )
+        if self.compiled_format.is_integer:
+            return result
+        return format_series(self.type_config_dict, result)
@@ -1,12 +1,30 @@
+import polars as pl
+
 from . import BaseFieldType
 from .decorators import apply_formatting_options
 from .decorators.apply_user_callback import apply_user_callback
+from .decorators.text_formatter import format_series
+from .format_compiler import CompiledFormat
+from .provider_pools import gather_from_pool, get_pool_size
 
 
 class CustomAddress(BaseFieldType):
+    VECTORIZED = True
+
+    ADDRESS_TOKENS = {
+        "$STREET": "street_address",
+        "$CITY": "city",
+        "$ZIP": "postcode",
+        "$STATE_ABBR": "state_abbr",
+        "$STATE_FULL": "state",
+    }
+
     def __init__(self, type_config_dict):
         super().__init__(type_config_dict)
         self.format_string = type_config_dict.get("format")
+        self.compiled_format = None
+        if self.format_string:
+            self.compiled_format = CompiledFormat(self.format_string, CustomAddress.ADDRESS_TOKENS)
 
     @apply_formatting_options
     @apply_user_callback
@@ -22,3 +40,18 @@ class CustomAddress(BaseFieldType):
             return_value = return_value.replace("$STATE_FULL", self.faker.state())
             return_value = self.faker.bothify(return_value)
             return return_value
+
+    def pool_size(self):
+        if self.compiled_format is None:
+            return get_pool_size(self.type_config_dict)
+        return None
+
+    def generate_obfuscated_series(self, key, series: pl.Series) -> pl.Series:
+        seeds = self.generate_seeds(key, series)
+        if self.compiled_format is None:
+            result = gather_from_pool(self, "address", seeds)
+        else:
+            result = self.compiled_format.render(
+                seeds, self.faker.locales, get_pool_size(self.type_config_dict)
+            )
+        return format_series(self.type_config_dict, result)
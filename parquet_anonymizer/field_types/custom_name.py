@@ -1,12 +1,30 @@
+import string
+
+import polars as pl
+
 from . import BaseFieldType
 from .decorators import apply_formatting_options
 from .decorators.apply_user_callback import apply_user_callback
+from .decorators.text_formatter import format_series
+from .format_compiler import CompiledFormat
+from .provider_pools import gather_from_pool, get_pool_size
 
 
 class CustomName(BaseFieldType):
+    VECTORIZED = True
+
+    NAME_TOKENS = {
+        "$FIRST": "first_name",
+        "$LAST": "last_name",
+        "$MI": list(string.ascii_uppercase),
+    }
+
     def __init__(self, type_config_dict):
         super().__init__(type_config_dict)
         self.format_string = type_config_dict.get("format")
+        self.compiled_format = None
+        if self.format_string:
+            self.compiled_format = CompiledFormat(self.format_string, CustomName.NAME_TOKENS)
 
     @apply_formatting_options
     @apply_user_callback
@@ -20,3 +38,18 @@ class CustomName(BaseFieldType):
             return_value = return_value.replace("$MI", self.faker.lexify("?").upper())
             return_value = self.faker.bothify(return_value)
             return return_value
+
+    def pool_size(self):
+        if self.compiled_format is None:
+            return get_pool_size(self.type_config_dict)
+        return None
+
+    def generate_obfuscated_series(self, key, series: pl.Series) -> pl.Series:
+        seeds = self.generate_seeds(key, series)
+        if self.compiled_format is None:
+            result = gather_from_pool(self, "name", seeds)
+        else:
+            result = self.compiled_format.render(
+                seeds, self.faker.locales, get_pool_size(self.type_config_dict)
+            )
+        return format_series(self.type_config_dict, result)
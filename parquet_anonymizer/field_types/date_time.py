@@ -1,6 +1,6 @@
 from datetime import datetime
 
-import dateutil.parser as date_parser
+import polars as pl
 
 from . import BaseFieldType
 from .decorators import apply_formatting_options
@@ -8,6 +8,8 @@ from .decorators.apply_user_callback import apply_user_callback
 
 
 class DateTimeField(BaseFieldType):
+    VECTORIZED = True
+
     def __init__(self, type_config_dict):
         super().__init__(type_config_dict)
         format_string = type_config_dict.get("format")
@@ -53,4 +55,58 @@ class DateTimeField(BaseFieldType):
             generated_date = generated_date.replace(year=year_delta_150)
         # return generated_date.strftime(self.format_string)
         generated_date = generated_date.replace(microsecond=0)
-        return generated_date
\ No newline at end of file
+        return generated_date
+
+    def generate_obfuscated_series(self, key, series: pl.Series) -> pl.Series:
+        """
+        Columnar version of generate_obfuscated_value: every seed becomes a whole-second offset
+        into the configured range, and the year handling is done with expressions. Date,
+        Datetime (with or without time zone) and string columns keep their dtype.
+        """
+        if series.dtype == pl.Utf8:
+            original = series.str.to_datetime(self.format_string, strict=False)
+            seeds = self.generate_seeds(key, series)
+        else:
+            original = series
+            # seed on the formatted value, so equal dates in string and date columns match
+            seeds = self.generate_seeds(key, series.dt.to_string(self.format_string))
+        range_seconds = int((self.range_end_date - self.range_start_date).total_seconds())
+        range_start = int((self.range_start_date - datetime(1970, 1, 1)).total_seconds())
+        offsets = (seeds % (max(range_seconds, 0) + 1)).cast(pl.Int64)
+        frame = pl.DataFrame(
+            {
+                "generated": ((offsets + range_start) * 1_000_000).cast(pl.Datetime("us")),
+                "original": original,
+            }
+        )
+
+        generated = pl.col("generated")
+        year = generated.dt.year()
+        if self.preserve_year:
+            year = pl.col("original").dt.year().fill_null(year)
+        if self.safe_harbor:
+            this_year = datetime.today().year
+            year = pl.when((year - this_year).abs() >= 90).then(this_year - 150).otherwise(year)
+        leap_day = (generated.dt.month() == 2) & (generated.dt.day() == 29)
+        if not self.preserve_year:
+            leap_day = leap_day & (year != generated.dt.year())
+        result = pl.datetime(
+            year,
+            pl.when(leap_day).then(3).otherwise(generated.dt.month()),
+            generated.dt.day(),
+            generated.dt.hour(),
+            generated.dt.minute(),
+            generated.dt.second(),
+        )
+
+        if series.dtype == pl.Utf8:
+            result = result.dt.to_string(self.format_string)
+        elif series.dtype == pl.Date:
+            result = result.dt.date()
+        elif isinstance(series.dtype, pl.Datetime):
+            if series.dtype.time_zone is not None:
+                result = result.dt.replace_time_zone(
+                    series.dtype.time_zone, ambiguous="earliest", non_existent="null"
+                )
+            result = result.dt.cast_time_unit(series.dtype.time_unit)
+        return frame.select(result.alias(series.name)).to_series()
@@ -12,6 +12,7 @@ def apply_user_callback(func):
 
         anonymized_value = func(self, *args, **kwargs)
 
+        # user callbacks are applied to whole columns instead, see UserCallback.handle_batch
         # if len(args) > 2:
         #     if isinstance(args[2], UserCallback):
         #         user_callback = args[2]
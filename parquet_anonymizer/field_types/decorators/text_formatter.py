@@ -11,3 +11,12 @@ def apply_formatting_options(func):
         return anonymized_value
 
     return wrapper
+
+
+def format_series(type_config_dict, series):
+    """Applies the same upper/lower options as apply_formatting_options to a whole column"""
+    if type_config_dict.get("upper"):
+        series = series.str.to_uppercase()
+    if type_config_dict.get("lower"):
+        series = series.str.to_lowercase()
+    return series
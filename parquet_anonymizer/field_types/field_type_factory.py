@@ -1,65 +1,72 @@
+import importlib
 import logging
+from collections.abc import Mapping
 
-from .city import City
-from .company import Company
-from .country import Country
-from .currency_symbol import CurrencySymbol
-from .custom import Custom
-from .custom_address import CustomAddress
-from .custom_name import CustomName
-from .date_time import DateTimeField
-from .email_address import EmailAddress
-from .file_name import FileName
-from .first_name import FirstName
-from .float_range import FloatRange
-from .full_address import FullAddress
-from .full_name import FullName
-from .iban import IBAN
-from .int_range import IntRange
-from .job import Job
-from .last_name import LastName
-from .normal_int import NormalInt
-from .options import Options
-from .phone_number import PhoneNumber
-from .safe_harbor_age import SafeHarborAge
-from .ssn import SSN
-from .street_address import StreetAddress
 from .user_type import UserType
-from .zip import Zip
 
 
 def get_logger():
     return logging.getLogger(__file__)
 
 
+class LazyTypeRegistry(Mapping):
+    """
+    Maps type names to field type classes given as "module:Class" paths relative to this package.
+    A class's module is only imported when its type is first looked up, so loading the factory
+    doesn't import every field type along with Faker and the other libraries they depend on.
+    """
+
+    def __init__(self, paths: dict):
+        self.paths = paths
+        self.classes = {}
+
+    def __getitem__(self, type_name):
+        if type_name not in self.classes:
+            module_name, class_name = self.paths[type_name].split(":")
+            module = importlib.import_module(module_name, __package__)
+            self.classes[type_name] = getattr(module, class_name)
+        return self.classes[type_name]
+
+    def __contains__(self, type_name):
+        return type_name in self.paths
+
+    def __iter__(self):
+        return iter(self.paths)
+
+    def __len__(self):
+        return len(self.paths)
+
+
 class FieldTypeFactory:
-    ACCEPTED_TYPES = {
-        "city": City,
-        "custom": Custom,
-        "custom_address": CustomAddress,
-        "custom_name": CustomName,
-        "datetime": DateTimeField,
-        "email_address": EmailAddress,
-        "first_name": FirstName,
-        "float_range": FloatRange,
-        "full_address": FullAddress,
-        "full_name": FullName,
-        "int_range": IntRange,
-        "last_name": LastName,
-        "normal_int": NormalInt,
-        "options": Options,
-        "safe_harbor_age": SafeHarborAge,
-        "ssn": SSN,
-        "street_address": StreetAddress,
-        "zip": Zip,
-        "country": Country,
-        "company": Company,
-        "job": Job,
-        "currency_symbol": CurrencySymbol,
-        "iban": IBAN,
-        "phone_number": PhoneNumber,
-        "file_name": FileName,
-    }
+    ACCEPTED_TYPES = LazyTypeRegistry(
+        {
+            "city": ".city:City",
+            "custom": ".custom:Custom",
+            "custom_address": ".custom_address:CustomAddress",
+            "custom_name": ".custom_name:CustomName",
+            "datetime": ".date_time:DateTimeField",
+            "email_address": ".email_address:EmailAddress",
+            "first_name": ".first_name:FirstName",
+            "float_range": ".float_range:FloatRange",
+            "full_address": ".full_address:FullAddress",
+            "full_name": ".full_name:FullName",
+            "int_range": ".int_range:IntRange",
+            "last_name": ".last_name:LastName",
+            "normal_int": ".normal_int:NormalInt",
+            "options": ".options:Options",
+            "safe_harbor_age": ".safe_harbor_age:SafeHarborAge",
+            "ssn": ".ssn:SSN",
+            "street_address": ".street_address:StreetAddress",
+            "zip": ".zip:Zip",
+            "country": ".country:Country",
+            "company": ".company:Company",
+            "job": ".job:Job",
+            "currency_symbol": ".currency_symbol:CurrencySymbol",
+            "iban": ".iban:IBAN",
+            "phone_number": ".phone_number:PhoneNumber",
+            "file_name": ".file_name:FileName",
+        }
+    )
 
     USER_TYPES = {}
 
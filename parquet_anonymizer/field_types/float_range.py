@@ -1,19 +1,36 @@
+import polars as pl
+
 from . import BaseFieldType
 from .decorators.apply_user_callback import apply_user_callback
+from .vectorized import cast_like, uniform
 
 
 class FloatRange(BaseFieldType):
+    VECTORIZED = True
+
+    def __init__(self, type_config_dict):
+        super().__init__(type_config_dict)
+        if type_config_dict.get("start") is None:
+            raise ValueError('"start" must be defined in config for FloatRange column types.')
+        if type_config_dict.get("end") is None:
+            raise ValueError('"end" must be defined in config for FloatRange column types.')
+        self.start = int(type_config_dict.get("start"))
+        self.end = int(type_config_dict.get("end"))
+        self.precision = None
+        if type_config_dict.get("precision"):
+            self.precision = int(type_config_dict.get("precision"))
+
     @apply_user_callback
     def generate_obfuscated_value(self, key, value, *args, **kwargs):
         self.seed_faker(key, value)
-        if self.type_config_dict.get("start") is None:
-            raise ValueError('"start" must be defined in config for FloatRange column types.')
-        if self.type_config_dict.get("end") is None:
-            raise ValueError('"end" must be defined in config for FloatRange column types.')
-        start = int(self.type_config_dict.get("start"))
-        end = int(self.type_config_dict.get("end"))
-        result = self.faker.random.uniform(start, end)
-        if self.type_config_dict.get("precision"):
-            precision = int(self.type_config_dict.get("precision"))
-            return round(float(result), precision)
+        result = self.faker.random.uniform(self.start, self.end)
+        if self.precision:
+            return round(float(result), self.precision)
         return result
+
+    def generate_obfuscated_series(self, key, series: pl.Series) -> pl.Series:
+        seeds = self.generate_seeds(key, series)
+        result = self.start + (self.end - self.start) * uniform(seeds)
+        if self.precision:
+            result = result.round(self.precision)
+        return cast_like(result, series, self.start, self.end)
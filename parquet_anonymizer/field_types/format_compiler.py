@@ -0,0 +1,82 @@
+import string
+
+import polars as pl
+
+from . import BaseFieldType
+from .provider_pools import POOL_SIZE, get_pool
+
+# The placeholders of Faker's bothify and the values each of them is replaced with.
+# "!" and "@" are replaced with an empty string half of the time, like Faker does.
+CHARACTER_CLASSES = {
+    "#": list(string.digits),
+    "%": list("123456789"),
+    "!": [""] * 10 + list(string.digits),
+    "@": [""] * 9 + list("123456789"),
+    "?": list(string.ascii_letters),
+}
+
+
+class CompiledFormat:
+    """
+    A bothify-style format string parsed once into literal text, character placeholders and
+    named tokens such as "$CITY", so whole columns can be rendered from seeds.
+
+    `tokens` maps each token to either the name of a Faker provider, whose pool is used, or a list
+    of values to choose from.
+    """
+
+    def __init__(self, format_string, tokens=None):
+        tokens = tokens or {}
+        # try longer tokens first, so e.g. "$STATE_ABBR" is not read as a shorter token
+        token_names = sorted(tokens, key=len, reverse=True)
+        self.format_string = format_string
+        self.parts = []
+        literal = ""
+        position = 0
+        while position < len(format_string):
+            token = next(
+                (name for name in token_names if format_string.startswith(name, position)), None
+            )
+            char = format_string[position]
+            if token is None and char not in CHARACTER_CLASSES:
+                literal += char
+                position += 1
+                continue
+            if literal:
+                self.parts.append(("literal", literal))
+                literal = ""
+            if token is not None:
+                choices = tokens[token]
+                position += len(token)
+            else:
+                choices = CHARACTER_CLASSES[char]
+                position += 1
+            if isinstance(choices, str):
+                self.parts.append(("provider", choices))
+            else:
+                self.parts.append(("choices", pl.Series(choices, dtype=pl.Utf8)))
+        if literal:
+            self.parts.append(("literal", literal))
+        # a format of only digits produces numbers rather than strings
+        self.is_integer = len(format_string) > 0 and all(c == "#" for c in format_string)
+
+    def render(self, seeds: pl.Series, locales, pool_size=POOL_SIZE) -> pl.Series:
+        """
+        Renders one string per seed, drawing every placeholder from its own seed stream. Provider
+        tokens draw from pools of `pool_size` values.
+        """
+        frame = pl.DataFrame({"seed": seeds})
+        columns = []
+        for stream, (kind, part) in enumerate(self.parts):
+            if kind == "literal":
+                columns.append(pl.lit(part))
+                continue
+            choices = get_pool(locales, part, pool_size) if kind == "provider" else part
+            indices = BaseFieldType.derive_seeds(seeds, stream) % len(choices)
+            columns.append(pl.lit(choices.gather(indices)))
+        # with_columns rather than select, so a format without placeholders still fills every row
+        frame = frame.with_columns(pl.concat_str(columns).alias("rendered"))
+        result = frame.get_column("rendered").alias(seeds.name)
+        if self.is_integer:
+            return result.cast(pl.Int64)
+        return result
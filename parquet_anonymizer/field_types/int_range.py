@@ -1,15 +1,27 @@
+import polars as pl
+
 from . import BaseFieldType
 from .decorators.apply_user_callback import apply_user_callback
+from .vectorized import cast_like, random_ints
 
 
 class IntRange(BaseFieldType):
+    VECTORIZED = True
+
+    def __init__(self, type_config_dict):
+        super().__init__(type_config_dict)
+        if type_config_dict.get("start") is None:
+            raise ValueError('"start" must be defined in config for IntRange column types.')
+        if type_config_dict.get("end") is None:
+            raise ValueError('"end" must be defined in config for IntRange column types.')
+        self.start = int(type_config_dict.get("start"))
+        self.end = int(type_config_dict.get("end"))
+
     @apply_user_callback
     def generate_obfuscated_value(self, key, value, *args, **kwargs):
         self.seed_faker(key, value)
-        if self.type_config_dict.get("start") is None:
-            raise ValueError('"start" must be defined in config for IntRange column types.')
-        if self.type_config_dict.get("end") is None:
-            raise ValueError('"end" must be defined in config for IntRange column types.')
-        start = int(self.type_config_dict.get("start"))
-        end = int(self.type_config_dict.get("end"))
-        return self.faker.random_int(start, end)
+        return self.faker.random_int(self.start, self.end)
+
+    def generate_obfuscated_series(self, key, series: pl.Series) -> pl.Series:
+        seeds = self.generate_seeds(key, series)
+        return cast_like(random_ints(seeds, self.start, self.end), series, self.start, self.end)
@@ -1,15 +1,29 @@
+import polars as pl
+
 from . import BaseFieldType
 from .decorators.apply_user_callback import apply_user_callback
+from .vectorized import MAX_STANDARD_NORMAL, cast_like, standard_normal
 
 
 class NormalInt(BaseFieldType):
+    VECTORIZED = True
+
+    def __init__(self, type_config_dict):
+        super().__init__(type_config_dict)
+        if type_config_dict.get("mean") is None:
+            raise ValueError('"mean" must be defined in config for normal_int column types.')
+        if type_config_dict.get("st_dev") is None:
+            raise ValueError('"st_dev" must be defined in config for normal_int column types.')
+        self.mean = float(type_config_dict.get("mean"))
+        self.st_dev = float(type_config_dict.get("st_dev"))
+
     @apply_user_callback
     def generate_obfuscated_value(self, key, value, *args, **kwargs):
         self.seed_faker(key, value)
-        if self.type_config_dict.get("mean") is None:
-            raise ValueError('"mean" must be defined in config for normal_int column types.')
-        if self.type_config_dict.get("st_dev") is None:
-            raise ValueError('"st_dev" must be defined in config for normal_int column types.')
-        mean = float(self.type_config_dict.get("mean"))
-        st_dev = float(self.type_config_dict.get("st_dev"))
-        return abs(int(self.faker.random.normalvariate(mean, st_dev)))
+        return abs(int(self.faker.random.normalvariate(self.mean, self.st_dev)))
+
+    def generate_obfuscated_series(self, key, series: pl.Series) -> pl.Series:
+        seeds = self.generate_seeds(key, series)
+        result = (self.mean + self.st_dev * standard_normal(seeds)).cast(pl.Int64).abs()
+        high = abs(self.mean) + abs(self.st_dev) * MAX_STANDARD_NORMAL
+        return cast_like(result, series, 0, int(high))
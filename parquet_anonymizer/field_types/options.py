@@ -1,19 +1,48 @@
+import polars as pl
+
 from . import BaseFieldType
-from .decorators import apply_formatting_options
-from .decorators.apply_user_callback import apply_user_callback
 
 
 class Options(BaseFieldType):
+    VECTORIZED = True
+
+    OUTPUT_DTYPES = ("categorical", "enum")
+
     def __init__(self, type_config_dict):
         super().__init__(type_config_dict)
         options = type_config_dict.get("options")
         if options is None:
             raise ValueError("Options field type must have an options list property defined")
+        if len(options) == 0:
+            raise ValueError("Options field type must have at least one option")
         self.options = options
+        dtype = type_config_dict.get("dtype")
+        if dtype is not None and dtype not in Options.OUTPUT_DTYPES:
+            raise ValueError(
+                f"Options dtype must be one of {', '.join(Options.OUTPUT_DTYPES)}, not {dtype}"
+            )
+        self.dtype = dtype
 
-    #@apply_formatting_options
-    #@apply_user_callback
     def generate_obfuscated_value(self, key, value, *args, **kwargs):
         self.seed_faker(key, str(value))
-        retval = self.faker.random_element(self.options)
         return self.faker.random_element(self.options)
+
+    def generate_obfuscated_series(self, key, series: pl.Series) -> pl.Series:
+        seeds = self.generate_seeds(key, series)
+        # a mixed list such as [1, "two", 3.0] becomes the text of its options
+        options = pl.Series(series.name, self.options, strict=False)
+        if self.dtype is None:
+            cast = options.cast(series.dtype, strict=False)
+            # keep the column's dtype only if every option fits it unchanged
+            if cast.cast(options.dtype, strict=False).equals(options):
+                options = cast
+        return options.gather(seeds % len(options))
+
+    def cast_output(self, anonymized: pl.Series) -> pl.Series:
+        if self.dtype == "categorical":
+            return anonymized.cast(pl.Utf8).cast(pl.Categorical)
+        if self.dtype == "enum":
+            categories = pl.Series(self.options, strict=False).drop_nulls().cast(pl.Utf8)
+            enum = pl.Enum(categories.unique(maintain_order=True))
+            return anonymized.cast(pl.Utf8).cast(enum)
+        return anonymized
@@ -0,0 +1,166 @@
+import json
+import os
+import tempfile
+
+import polars as pl
+
+from parquet_anonymizer.cardinality import (
+    estimate_cardinality,
+    merge_registers,
+    registers_from_codes,
+    sketch_expression,
+)
+from parquet_anonymizer.util import get_cache_dir
+
+from . import BaseFieldType
+from .decorators.text_formatter import format_series
+
+# Default number of provider calls sampled into a pool. Sampling (rather than reading the
+# provider's word lists) also covers providers built from formats, and duplicates keep the
+# provider's weighting. A column can't get more distinct values out of a pool than it holds, so
+# columns with more distinct values can raise it with their `pool_size` option.
+POOL_SIZE = 10_000
+
+_pools = {}
+
+
+def get_pool(locales, provider, size=POOL_SIZE):
+    """
+    Returns `size` candidate values of a Faker provider method for the given locales, building
+    them once and caching them in memory and on disk.
+    """
+    pool_key = ("_".join(locales), provider, size)
+    if pool_key not in _pools:
+        import faker
+
+        pool_file = os.path.join(
+            get_cache_dir(),
+            "pools",
+            f"faker-{faker.VERSION}",
+            pool_key[0],
+            f"{provider}-{size}.json",
+        )
+        if os.path.isfile(pool_file):
+            with open(pool_file) as f:
+                values = json.load(f)
+        else:
+            values = _build_pool(locales, provider, size)
+            _save_pool(pool_file, values)
+        _pools[pool_key] = pl.Series(provider, values, dtype=pl.Utf8)
+    return _pools[pool_key]
+
+
+def get_pool_size(type_config_dict) -> int:
+    """The pool size of a column: its `pool_size` option, or POOL_SIZE"""
+    size = int(type_config_dict.get("pool_size", POOL_SIZE))
+    if size < 1:
+        raise ValueError(f"pool_size must be positive, got {size}.")
+    return size
+
+
+def gather_from_pool(field_type: BaseFieldType, provider, seeds: pl.Series) -> pl.Series:
+    """
+    Picks one value per seed from the provider's pool, sized by the column's `pool_size` option.
+
+    Distinct values that pick the same pool entry share their anonymized value. Some always do
+    once a column has more distinct values than the pool holds. The seeds are often only part
+    of a column, a batch, a worker's chunk or the values missing from the mapping cache, so
+    PoolOverflowCheck warns about that for the whole column instead.
+    """
+    size = get_pool_size(field_type.type_config_dict)
+    pool = get_pool(field_type.faker.locales, provider, size)
+    return pool.gather(seeds % len(pool))
+
+
+class PoolOverflowCheck:
+    """
+    Warns, once per column, when a vectorized column has more distinct values than the pool its
+    values are gathered from (BaseFieldType.pool_size), so some of them are anonymized to the
+    same value. It runs in the parent process on all of a column's distinct values, before the
+    mapping cache or the worker processes split them, and counts them over every batch the
+    column is anonymized in: exactly for a single batch and with HyperLogLog sketches over
+    several, like Metrics.
+    """
+
+    def __init__(self, config):
+        from .field_type_factory import FieldTypeFactory
+
+        self.pool_sizes = {}
+        if config.vectorized:
+            for column_name, type_config_dict in config.columns_to_anonymize.items():
+                field_type = FieldTypeFactory.get_type(type_config_dict)
+                if field_type.VECTORIZED and field_type.pool_size() is not None:
+                    self.pool_sizes[column_name] = field_type.pool_size()
+        self.columns = {}
+
+    def add(self, column_name, uniques: pl.Series):
+        """Adds one batch of a column's distinct non-null values."""
+        size = self.pool_sizes.get(column_name)
+        if size is None:
+            return
+        column = self.columns.setdefault(
+            column_name, {"batches": 0, "largest": 0, "registers": None, "warned": False}
+        )
+        if column["warned"]:
+            return
+        column["batches"] += 1
+        column["largest"] = max(column["largest"], len(uniques))
+        codes = uniques.to_frame("value").select(sketch_expression(pl.col("value"))).item()
+        registers = registers_from_codes(codes)
+        if column["registers"] is not None:
+            registers = merge_registers(column["registers"], registers)
+        column["registers"] = registers
+        distinct = column["largest"]
+        if column["batches"] > 1:
+            distinct = max(distinct, estimate_cardinality(registers))
+        if distinct > size:
+            column["warned"] = True
+            BaseFieldType.get_logger().warning(
+                f"Column {column_name} has {'about ' if column['batches'] > 1 else ''}{distinct} "
+                + f"distinct values, more than the {size} values in its pool, so some of them "
+                + "are anonymized to the same value. Raise its pool_size option to reduce such "
+                + "collisions."
+            )
+
+
+def _build_pool(locales, provider, size):
+    import faker
+
+    # a private, fixed-seed instance keeps the pool reproducible and leaves the shared one alone
+    generator = faker.Faker(locales)
+    generator.seed_instance(0)
+    method = getattr(generator, provider)
+    return [method() for _ in range(size)]
+
+
+def _save_pool(pool_file, values):
+    os.makedirs(os.path.dirname(pool_file), exist_ok=True)
+    # write to a temporary file first, so concurrent workers never read a partial pool
+    fd, tmp_file = tempfile.mkstemp(dir=os.path.dirname(pool_file), suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        json.dump(values, f)
+    os.replace(tmp_file, pool_file)
+
+
+class PooledFieldType(BaseFieldType):
+    """
+    Base for field types that pick one value from a Faker provider. In vectorized mode a column
+    becomes a single gather from the provider's pool, indexed by seed modulo the pool size.
+
+    The pool holds POOL_SIZE values unless the column sets `pool_size`, which caps the number of
+    distinct anonymized values the column can get in vectorized mode; see PoolOverflowCheck.
+    """
+
+    VECTORIZED = True
+    PROVIDER = None
+
+    def pool_size(self):
+        return get_pool_size(self.type_config_dict)
+
+    def generate_obfuscated_series(self, key, series: pl.Series) -> pl.Series:
+        seeds = self.generate_seeds(key, series)
+        values = self.from_pool(gather_from_pool(self, self.PROVIDER, seeds))
+        return format_series(self.type_config_dict, values)
+
+    def from_pool(self, values: pl.Series) -> pl.Series:
+        return values
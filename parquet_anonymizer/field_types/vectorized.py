@@ -0,0 +1,49 @@
+"""
+Column-at-a-time random draws from the UInt64 seeds of BaseFieldType.generate_seeds.
+
+Every row's draw only depends on its own seed, so results are deterministic per key and value
+no matter how a column is batched or split across workers.
+"""
+
+import math
+
+import polars as pl
+
+from . import BaseFieldType
+
+
+def uniform(seeds: pl.Series, stream: int = 0) -> pl.Series:
+    """Uniform floats in [0, 1) built from the top 53 bits of each seed."""
+    seeds = BaseFieldType.derive_seeds(seeds, stream)
+    return (seeds // 2048).cast(pl.Float64) * 2.0**-53
+
+
+def random_ints(seeds: pl.Series, low: int, high: int, stream: int = 0) -> pl.Series:
+    """Integers in [low, high], both ends inclusive."""
+    seeds = BaseFieldType.derive_seeds(seeds, stream)
+    return (seeds % (high - low + 1)).cast(pl.Int64) + low
+
+
+# The largest magnitude standard_normal returns: its uniform draws are at least 2**-53 from 1
+MAX_STANDARD_NORMAL = math.sqrt(-2.0 * math.log(2.0**-53))
+
+
+def standard_normal(seeds: pl.Series, stream: int = 0) -> pl.Series:
+    """Standard normal floats, using the Box-Muller transform over two derived uniform draws."""
+    radius = (-2.0 * (1.0 - uniform(seeds, stream)).log()).sqrt()
+    return radius * (2.0 * math.pi * uniform(seeds, stream + 1)).cos()
+
+
+def cast_like(result: pl.Series, series: pl.Series, low, high) -> pl.Series:
+    """
+    Keeps a numeric input column's dtype, so e.g. an Int32 column is not widened, as long as
+    every value the field type can generate, from `low` to `high`, fits in it. Otherwise the
+    column is widened to the generated dtype (Int64 or Float64) rather than failing. This only
+    depends on the config and the column's dtype, so all batches and chunks of a column agree.
+    """
+    if not series.dtype.is_numeric():
+        return result
+    bounds = pl.Series([low, high], dtype=result.dtype)
+    if bounds.cast(series.dtype, strict=False).null_count() > 0:
+        return result
+    return result.cast(series.dtype)
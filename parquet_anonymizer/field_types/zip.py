@@ -1,42 +1,58 @@
+import polars as pl
+
 from . import BaseFieldType
 from .decorators.apply_user_callback import apply_user_callback
+from .provider_pools import gather_from_pool, get_pool_size
+from .vectorized import cast_like
 
 
 class Zip(BaseFieldType):
-    RESTRICTED_ZIPS = [
-        "036",
-        "692",
-        "878",
-        "059",
-        "790",
-        "879",
-        "063",
-        "821",
-        "884",
-        "102",
-        "823",
-        "890",
-        "203",
-        "830",
-        "893",
-        "556",
-        "831",
-    ]
-
-    def __generate_value_from_mask(self, mask, value):
+    VECTORIZED = True
+
+    # the largest five-digit ZIP, which bounds the values of an integer column
+    MAX_ZIP = 99_999
+
+    RESTRICTED_ZIPS = frozenset(
+        [
+            "036",
+            "692",
+            "878",
+            "059",
+            "790",
+            "879",
+            "063",
+            "821",
+            "884",
+            "102",
+            "823",
+            "890",
+            "203",
+            "830",
+            "893",
+            "556",
+            "831",
+        ]
+    )
+
+    def __init__(self, type_config_dict):
+        super().__init__(type_config_dict)
+        mask = type_config_dict.get("mask")
+        if mask is not None:
+            mask = str(mask)
+            if len(mask) != 5:
+                raise ValueError("Zip field mask must be of length 5")
+            if any(char not in "01" for char in mask):
+                raise ValueError("Mask must consist of 0s and 1s")
+        self.mask = mask
+
+    def __generate_value_from_mask(self, value):
         generated_value = ""
-        mask = str(mask)
         value = str(value)
         # Ensure that restricted ZIPs don't ever get preserved.
         if len(value) > 3 and value[:3] in Zip.RESTRICTED_ZIPS:
             value = "000" + value[3:]
-        if len(mask) != 5:
-            raise ValueError("Zip field mask must be of length 5")
-        for char_idx in range(len(mask)):
-            char = mask[char_idx]
-            if not char.isdigit() or (int(char) != 0 and int(char) != 1):
-                raise ValueError("Mask must consist of 0s and 1s")
-            if int(char) == 0:
+        for char_idx, char in enumerate(self.mask):
+            if char == "0":
                 generated_value += str(self.faker.random_int(1, 9))
             else:
                 try:
@@ -48,7 +64,44 @@ class Zip(BaseFieldType):
     @apply_user_callback
     def generate_obfuscated_value(self, key, value, *args, **kwargs):
         self.seed_faker(key, value)
-        mask = self.type_config_dict.get("mask")
-        if mask is not None:
-            return self.__generate_value_from_mask(mask, value)
+        if self.mask is not None:
+            return self.__generate_value_from_mask(value)
         return self.faker.postcode()
+
+    def pool_size(self):
+        if self.mask is None:
+            return get_pool_size(self.type_config_dict)
+        return None
+
+    def generate_obfuscated_series(self, key, series: pl.Series) -> pl.Series:
+        result = self.__generate_series(key, series)
+        if series.dtype.is_integer():
+            # an integer column stays one; output that isn't a number becomes null
+            return cast_like(result.cast(pl.Int64, strict=False), series, 0, Zip.MAX_ZIP)
+        return result
+
+    def __generate_series(self, key, series: pl.Series) -> pl.Series:
+        seeds = self.generate_seeds(key, series)
+        if self.mask is None:
+            return gather_from_pool(self, "postcode", seeds)
+
+        frame = pl.DataFrame({"value": series.cast(pl.Utf8)})
+        value = pl.col("value")
+        # Ensure that restricted ZIPs don't ever get preserved.
+        value = (
+            pl.when((value.str.len_chars() > 3) & value.str.slice(0, 3).is_in(Zip.RESTRICTED_ZIPS))
+            .then(pl.lit("000") + value.str.slice(3))
+            .otherwise(value)
+        )
+        parts = []
+        # like the per-value path, the output stops at the first kept digit the value is missing
+        truncated = pl.lit(False)
+        for char_idx, char in enumerate(self.mask):
+            if char == "0":
+                digits = self.derive_seeds(seeds, char_idx) % 9 + 1
+                part = pl.lit(digits.cast(pl.Utf8))
+            else:
+                truncated = truncated | (value.str.len_chars() <= char_idx)
+                part = value.str.slice(char_idx, 1)
+            parts.append(pl.when(truncated).then(pl.lit("")).otherwise(part))
+        return frame.select(pl.concat_str(parts).alias(series.name)).to_series()
@@ -0,0 +1,259 @@
+import io
+import json
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+
+import polars as pl
+import xxhash
+
+from parquet_anonymizer.config import DEFAULT_CACHE_MAX_SIZE_MB
+from parquet_anonymizer.field_types import BaseFieldType
+from parquet_anonymizer.util import get_cache_dir
+
+CACHE_FILE_NAME = "mappings.sqlite"
+
+# Fraction of the entries evicted at once when the cache grows beyond its maximum size
+EVICTION_FRACTION = 0.25
+
+# Seconds a process waits for another one's write to finish before giving up
+BUSY_TIMEOUT_SECONDS = 60
+
+
+class MappingCache:
+    """
+    Persistent SQLite store of anonymized values, shared across runs and files.
+
+    Entries are keyed by a namespace, derived from the secret key, the column's type configuration
+    and the library versions, and by a 128-bit keyed hash of the original value. Neither the secret
+    key nor the original values are stored. When the cache grows beyond `max_size_mb` the least
+    recently used entries are evicted.
+
+    Several processes can share a cache: reads run in their own transactions, and every write
+    takes the write lock upfront (BEGIN IMMEDIATE), waiting up to BUSY_TIMEOUT_SECONDS for other
+    writers. A transaction that read first and only then wrote would fail at once instead, as
+    SQLite can't wait for a lock there without risking a deadlock.
+    """
+
+    def __init__(self, cache_dir=None, max_size_mb=DEFAULT_CACHE_MAX_SIZE_MB):
+        cache_dir = cache_dir or get_cache_dir()
+        os.makedirs(cache_dir, exist_ok=True)
+        self.max_size = max_size_mb * 1024 * 1024
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # autocommit, so transactions are only those started by _transaction
+        self.connection = sqlite3.connect(
+            os.path.join(cache_dir, CACHE_FILE_NAME),
+            timeout=BUSY_TIMEOUT_SECONDS,
+            isolation_level=None,
+        )
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS mappings (
+                namespace INTEGER NOT NULL,
+                key_1 INTEGER NOT NULL,
+                key_2 INTEGER NOT NULL,
+                anonymized,
+                last_used INTEGER NOT NULL,
+                UNIQUE (namespace, key_1, key_2)
+            );
+            CREATE INDEX IF NOT EXISTS mappings_last_used ON mappings (last_used);
+            CREATE TABLE IF NOT EXISTS namespaces (namespace INTEGER PRIMARY KEY, schema BLOB);
+            CREATE TEMP TABLE lookup_keys (
+                position INTEGER PRIMARY KEY, key_1 INTEGER, key_2 INTEGER
+            );
+            """
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        self.connection.close()
+
+    @contextmanager
+    def _transaction(self, mode="DEFERRED"):
+        """Runs the enclosed statements in one transaction, IMMEDIATE for ones that write."""
+        self.connection.execute(f"BEGIN {mode}")
+        try:
+            yield
+        except BaseException:
+            self.connection.execute("ROLLBACK")
+            raise
+        self.connection.execute("COMMIT")
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+    @staticmethod
+    def namespace(secret_key, type_config_dict, vectorized, dtype):
+        """All values that share a namespace are anonymized the same way."""
+        import faker
+
+        components = [
+            xxhash.xxh3_128_hexdigest(secret_key.encode()),
+            json.dumps(type_config_dict, sort_keys=True, default=str),
+            str(bool(vectorized)),
+            str(dtype),
+            pl.__version__,
+            faker.VERSION,
+        ]
+        return xxhash.xxh64_intdigest("|".join(components).encode()) - 2**63
+
+    @staticmethod
+    def value_keys(secret_key, uniques: pl.Series) -> pl.DataFrame:
+        """Two independent keyed 64-bit hashes per value, as signed integers for SQLite"""
+        # streams 1 and 2, as stream 0 seeds the vectorized field types
+        keys = {
+            f"key_{stream}": BaseFieldType.keyed_hash(secret_key, uniques, stream)
+            for stream in (1, 2)
+        }
+        return pl.DataFrame(keys).select(pl.all().reinterpret(signed=True))
+
+    def lookup(
+        self, secret_key, field_type: BaseFieldType, vectorized, uniques: pl.Series
+    ) -> "CacheLookup":
+        namespace = MappingCache.namespace(
+            secret_key, field_type.type_config_dict, vectorized, uniques.dtype
+        )
+        keys = MappingCache.value_keys(secret_key, uniques)
+        cursor = self.connection.cursor()
+        # lookup_keys is a temporary table, so filling it doesn't lock the shared database
+        with self._transaction():
+            cursor.execute("DELETE FROM lookup_keys")
+            cursor.executemany(
+                "INSERT INTO lookup_keys VALUES (?, ?, ?)",
+                zip(range(len(keys)), keys["key_1"], keys["key_2"]),
+            )
+            rows = cursor.execute(
+                """
+                SELECT lookup_keys.position, mappings.anonymized FROM lookup_keys
+                JOIN mappings ON mappings.namespace = ?
+                    AND mappings.key_1 = lookup_keys.key_1 AND mappings.key_2 = lookup_keys.key_2
+                """,
+                (namespace,),
+            ).fetchall()
+        if rows:
+            with self._transaction("IMMEDIATE"):
+                cursor.execute(
+                    """
+                    UPDATE mappings SET last_used = ? WHERE namespace = ? AND (key_1, key_2) IN
+                        (SELECT key_1, key_2 FROM lookup_keys)
+                    """,
+                    (time.time_ns(), namespace),
+                )
+        self.hits += len(rows)
+        self.misses += len(uniques) - len(rows)
+        return CacheLookup(self, namespace, keys, uniques, rows)
+
+    def load_dtype(self, namespace):
+        row = self.connection.execute(
+            "SELECT schema FROM namespaces WHERE namespace = ?", (namespace,)
+        ).fetchone()
+        return pl.read_ipc(io.BytesIO(row[0])).dtypes[0]
+
+    def insert(self, namespace, keys: pl.DataFrame, anonymized: pl.Series):
+        schema = io.BytesIO()
+        pl.DataFrame(schema={"anonymized": anonymized.dtype}).write_ipc(schema)
+        last_used = time.time_ns()
+        with self._transaction("IMMEDIATE"):
+            self.connection.execute(
+                "INSERT OR IGNORE INTO namespaces VALUES (?, ?)", (namespace, schema.getvalue())
+            )
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO mappings VALUES (?, ?, ?, ?, ?)",
+                (
+                    (namespace, key_1, key_2, value, last_used)
+                    for key_1, key_2, value in zip(
+                        keys["key_1"], keys["key_2"], _to_storage(anonymized)
+                    )
+                ),
+            )
+        self.evict()
+
+    def size(self):
+        page_size, page_count, freelist_count = (
+            self.connection.execute(f"PRAGMA {pragma}").fetchone()[0]
+            for pragma in ("page_size", "page_count", "freelist_count")
+        )
+        return (page_count - freelist_count) * page_size
+
+    def evict(self):
+        while self.size() > self.max_size:
+            entries = self.connection.execute("SELECT COUNT(*) FROM mappings").fetchone()[0]
+            if entries == 0:
+                return
+            with self._transaction("IMMEDIATE"):
+                deleted = self.connection.execute(
+                    """
+                    DELETE FROM mappings WHERE rowid IN
+                        (SELECT rowid FROM mappings ORDER BY last_used LIMIT ?)
+                    """,
+                    (max(1, int(entries * EVICTION_FRACTION)),),
+                ).rowcount
+            self.evictions += deleted
+
+
+class CacheLookup:
+    """
+    The result of looking up a column's distinct values. `missing` holds the values that still
+    have to be anonymized; complete() stores them and returns the values for all of `uniques`.
+    """
+
+    def __init__(self, cache: MappingCache, namespace, keys, uniques: pl.Series, rows):
+        self.cache = cache
+        self.namespace = namespace
+        self.keys = keys
+        self.uniques = uniques
+        self.hit_positions = pl.Series([position for position, _ in rows], dtype=pl.UInt32)
+        self.hit_values = [value for _, value in rows]
+        is_hit = pl.Series([False] * len(uniques))
+        if rows:
+            is_hit = is_hit.scatter(self.hit_positions, True)
+        self.missing_positions = is_hit.not_().arg_true()
+        self.missing = uniques.gather(self.missing_positions)
+
+    def complete(self, generated: pl.Series = None) -> pl.Series:
+        if self.missing.is_empty():
+            dtype = self.cache.load_dtype(self.namespace)
+            return _from_storage(self.hit_values, dtype).alias(self.uniques.name)
+        missing_keys = self.keys.select(pl.all().gather(self.missing_positions))
+        self.cache.insert(self.namespace, missing_keys, generated)
+        if self.hit_positions.is_empty():
+            return generated
+        anonymized = pl.Series(self.uniques.name, [None] * len(self.uniques), dtype=generated.dtype)
+        anonymized = anonymized.scatter(self.missing_positions, generated)
+        return anonymized.scatter(
+            self.hit_positions, _from_storage(self.hit_values, generated.dtype)
+        )
+
+
+def _to_storage(anonymized: pl.Series):
+    """Converts values to types SQLite stores natively, which _from_storage can convert back."""
+    if isinstance(anonymized.dtype, (pl.Categorical, pl.Enum)):
+        return anonymized.cast(pl.Utf8).to_list()
+    if anonymized.dtype.is_temporal():
+        return anonymized.to_physical().to_list()
+    if anonymized.dtype == pl.Boolean:
+        return anonymized.cast(pl.Int8).to_list()
+    return anonymized.to_list()
+
+
+def _from_storage(values, dtype) -> pl.Series:
+    if dtype.is_temporal():
+        return pl.Series(values, dtype=pl.Int64).cast(dtype)
+    if dtype == pl.Boolean:
+        return pl.Series(values, dtype=pl.Int8).cast(dtype)
+    return pl.Series(values).cast(dtype)
@@ -0,0 +1,188 @@
+import json
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Iterable, Iterator
+
+import polars as pl
+
+from parquet_anonymizer.cardinality import (
+    estimate_cardinality,
+    merge_registers,
+    registers_from_codes,
+    sketch_expression,
+)
+
+try:
+    import resource
+except ImportError:
+    # not available on Windows
+    resource = None
+
+
+class Metrics:
+    """
+    Records where the time of an anonymization run goes.
+
+    Stages (read, anonymize, write) are timed exclusively: while a stage runs inside another one,
+    e.g. reading the next batch while writing, the time only counts for the inner stage. Columns
+    record the time spent anonymizing them, their rows, nulls and distinct values and their
+    mapping cache hits. Distinct values are counted exactly for a single batch and estimated
+    with HyperLogLog sketches over several.
+
+    Pass an instance to the anonymize_* functions and read it with to_dict() afterwards. A
+    disabled instance records nothing, so the functions can use one unconditionally.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        # the most worker processes any part of the run used
+        self.workers = 0
+        self.started = time.perf_counter()
+        self.stages = {}
+        self.columns = {}
+        self._nested_seconds = []
+
+    def stage(self, name):
+        """Context manager timing a stage. It provides the stage's dict to count rows in."""
+        if not self.enabled:
+            return nullcontext({"seconds": 0.0, "rows": 0})
+        return self._stage(name)
+
+    @contextmanager
+    def _stage(self, name):
+        stage = self.stages.setdefault(name, {"seconds": 0.0, "rows": 0})
+        start = time.perf_counter()
+        self._nested_seconds.append(0.0)
+        try:
+            yield stage
+        finally:
+            elapsed = time.perf_counter() - start
+            nested = self._nested_seconds.pop()
+            if self._nested_seconds:
+                self._nested_seconds[-1] += elapsed
+            stage["seconds"] += elapsed - nested
+
+    def timed_batches(self, name, batches: Iterable[pl.DataFrame]) -> Iterator[pl.DataFrame]:
+        """Times producing each dataframe of `batches` as a stage, and counts their rows."""
+        if not self.enabled:
+            return iter(batches)
+        return self._timed_batches(name, iter(batches))
+
+    def _timed_batches(self, name, batches):
+        while True:
+            with self._stage(name) as stage:
+                batch = next(batches, None)
+                if batch is not None:
+                    stage["rows"] += len(batch)
+            if batch is None:
+                return
+            yield batch
+
+    def record_column(
+        self,
+        series: pl.Series,
+        uniques: pl.Series,
+        type_name: str,
+        seconds: float,
+        cache_hits: int = 0,
+    ):
+        """Adds one batch of a column: the column and its distinct non-null values"""
+        if not self.enabled:
+            return
+        column = self.columns.setdefault(
+            series.name,
+            {
+                "type": type_name,
+                "seconds": 0.0,
+                "rows": 0,
+                "null_count": 0,
+                "batches": 0,
+                "values_anonymized": 0,
+                "cache_hits": 0,
+                "registers": None,
+            },
+        )
+        column["seconds"] += seconds
+        column["rows"] += len(series)
+        column["null_count"] += series.null_count()
+        column["batches"] += 1
+        column["values_anonymized"] += len(uniques)
+        column["cache_hits"] += cache_hits
+        codes = uniques.to_frame("value").select(sketch_expression(pl.col("value"))).item()
+        registers = registers_from_codes(codes)
+        if column["registers"] is not None:
+            registers = merge_registers(column["registers"], registers)
+        column["registers"] = registers
+
+    def to_dict(self) -> dict:
+        seconds = time.perf_counter() - self.started
+        columns = {}
+        for name, column in self.columns.items():
+            columns[name] = {
+                "type": column["type"],
+                "seconds": round(column["seconds"], 4),
+                "rows": column["rows"],
+                "rows_per_second": _per_second(column["rows"], column["seconds"]),
+                "null_count": column["null_count"],
+                "distinct_count": (
+                    column["values_anonymized"]
+                    if column["batches"] == 1
+                    else estimate_cardinality(column["registers"])
+                ),
+                "values_anonymized": column["values_anonymized"],
+                "cache_hits": column["cache_hits"],
+                "cache_hit_rate": _fraction(column["cache_hits"], column["values_anonymized"]),
+            }
+        rows = self.stages.get("anonymize", {}).get("rows") or max(
+            (column["rows"] for column in self.columns.values()), default=0
+        )
+        cache_hits = sum(column["cache_hits"] for column in self.columns.values())
+        values = sum(column["values_anonymized"] for column in self.columns.values())
+        metrics = {
+            "seconds": round(seconds, 4),
+            "rows": rows,
+            "rows_per_second": _per_second(rows, seconds),
+            "cache_hit_rate": _fraction(cache_hits, values),
+            "peak_rss_mb": peak_rss_mb(),
+        }
+        if self.workers:
+            metrics["workers"] = self.workers
+            metrics["peak_worker_rss_mb"] = peak_rss_mb(children=True)
+        return {
+            **metrics,
+            "stages": {
+                name: {
+                    "seconds": round(stage["seconds"], 4),
+                    "rows": stage["rows"],
+                    "rows_per_second": _per_second(stage["rows"], stage["seconds"]),
+                }
+                for name, stage in self.stages.items()
+            },
+            "columns": columns,
+        }
+
+    def write(self, path, **extra):
+        """Writes to_dict() as JSON, along with `extra` keys such as the file names"""
+        with open(path, "w") as metrics_file:
+            json.dump({**extra, **self.to_dict()}, metrics_file, indent=2)
+
+
+def _per_second(count, seconds):
+    return round(count / seconds) if seconds else None
+
+
+def _fraction(part, whole):
+    return round(part / whole, 4) if whole else None
+
+
+def peak_rss_mb(children=False):
+    """
+    Peak resident memory of this process, or of its largest finished child process, e.g. a
+    worker, in MB. None where the platform doesn't report it.
+    """
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF)
+    # kilobytes on Linux, bytes on macOS
+    return round(usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
@@ -0,0 +1,161 @@
+import math
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import polars as pl
+import pyarrow as pa
+
+from parquet_anonymizer.config import Config
+from parquet_anonymizer.field_types.field_type_factory import FieldTypeFactory
+from parquet_anonymizer.field_types.provider_pools import PoolOverflowCheck
+from parquet_anonymizer.mapping_cache import MappingCache
+from parquet_anonymizer.metrics import Metrics
+from parquet_anonymizer.user.user_callback import UserCallback
+
+# Distinct values per work unit below which splitting a column is not worth the IPC overhead.
+MIN_CHUNK_SIZE = 5_000
+
+_worker_state = {}
+
+
+def _init_worker(columns_to_anonymize, secret_key, vectorized, user_types, user_callback):
+    """Builds the field types once per worker process."""
+    FieldTypeFactory.USER_TYPES.update(user_types)
+    _worker_state["field_types"] = {
+        column_name: FieldTypeFactory.get_type(type_config_dict)
+        for column_name, type_config_dict in columns_to_anonymize.items()
+    }
+    _worker_state["secret_key"] = secret_key
+    _worker_state["vectorized"] = vectorized
+    _worker_state["user_callback"] = user_callback
+
+
+def _anonymize_chunk(column_name: str, uniques: pa.Array) -> tuple[pa.Array, float]:
+    """
+    Returns the chunk's anonymized values and the seconds it took to generate them. The user
+    callback is applied in the parent process, once all chunks and cached values are together.
+    """
+    from parquet_anonymizer.anonymizer import anonymize_uniques
+
+    start = time.perf_counter()
+    anonymized = anonymize_uniques(
+        _worker_state["secret_key"],
+        pl.from_arrow(uniques),
+        _worker_state["field_types"][column_name],
+        _worker_state["user_callback"],
+        vectorized=_worker_state["vectorized"],
+    )
+    return anonymized.to_arrow(), time.perf_counter() - start
+
+
+class ColumnWorkerPool:
+    """
+    Anonymizes dataframes on a pool of worker processes.
+
+    Every column is reduced to its distinct non-null values, which are split into chunks and
+    fanned out to the workers as (column, chunk) work units. Values travel to and from the workers
+    as Arrow arrays, and the results are passed to the user callback and mapped back onto the
+    rows in the parent process. The time a column takes, recorded in `metrics`, is the time the
+    workers spent on its chunks plus the time spent on it in the parent process.
+    """
+
+    def __init__(
+        self,
+        config: Config,
+        workers: int,
+        user_callback: UserCallback = None,
+        cache: MappingCache = None,
+        metrics: Metrics = None,
+    ):
+        self.config = config
+        self.workers = workers
+        self.user_callback = user_callback
+        self.cache = cache
+        self.metrics = metrics or Metrics(enabled=False)
+        self.metrics.workers = max(self.metrics.workers, workers)
+        self.field_types = {
+            column_name: FieldTypeFactory.get_type(type_config_dict)
+            for column_name, type_config_dict in config.columns_to_anonymize.items()
+        }
+        # checked here, as the workers only see chunks of a column's distinct values
+        self.pool_check = PoolOverflowCheck(config)
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers,
+            # forking a process that already runs polars' thread pool can deadlock
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(
+                dict(config.columns_to_anonymize),
+                config.secret_key,
+                config.vectorized,
+                dict(FieldTypeFactory.USER_TYPES),
+                user_callback,
+            ),
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        self.executor.shutdown(cancel_futures=True)
+
+    def anonymize_dataframe(self, df: pl.DataFrame) -> pl.DataFrame:
+        from parquet_anonymizer.anonymizer import apply_user_callback
+
+        pending = {}
+        for column_name in self.config.columns_to_anonymize:
+            if column_name not in df.columns:
+                raise ValueError(f"{column_name} not found in dataframe.")
+            start = time.perf_counter()
+            uniques = df[column_name].drop_nulls().unique()
+            self.pool_check.add(column_name, uniques)
+            lookup = None
+            missing = uniques
+            if self.cache is not None and not uniques.is_empty():
+                lookup = self.cache.lookup(
+                    self.config.secret_key,
+                    self.field_types[column_name],
+                    self.config.vectorized,
+                    uniques,
+                )
+                missing = lookup.missing
+            chunk_size = max(MIN_CHUNK_SIZE, math.ceil(len(missing) / (self.workers * 4)))
+            pending[column_name] = (
+                uniques,
+                lookup,
+                time.perf_counter() - start,
+                [
+                    self.executor.submit(
+                        _anonymize_chunk, column_name, missing.slice(offset, chunk_size).to_arrow()
+                    )
+                    for offset in range(0, len(missing), chunk_size)
+                ],
+            )
+
+        for column_name, (uniques, lookup, seconds, futures) in pending.items():
+            series = df[column_name]
+            field_type = self.field_types[column_name]
+            type_name = field_type.type_config_dict["type"]
+            if uniques.is_empty():
+                self.metrics.record_column(series, uniques, type_name, seconds)
+                continue
+            generated = None
+            if futures:
+                results = [future.result() for future in futures]
+                seconds += sum(chunk_seconds for _, chunk_seconds in results)
+                generated = pl.concat([pl.from_arrow(chunk) for chunk, _ in results])
+            start = time.perf_counter()
+            anonymized = generated if lookup is None else lookup.complete(generated)
+            anonymized = apply_user_callback(self.user_callback, field_type, uniques, anonymized)
+            anonymized = field_type.cast_output(anonymized)
+            df = df.with_columns(
+                series.replace_strict(uniques, anonymized, return_dtype=anonymized.dtype)
+            )
+            cache_hits = 0 if lookup is None else len(uniques) - len(lookup.missing)
+            seconds += time.perf_counter() - start
+            self.metrics.record_column(series, uniques, type_name, seconds, cache_hits)
+        return df
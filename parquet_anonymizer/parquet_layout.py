@@ -0,0 +1,99 @@
+import pyarrow.parquet as pq
+
+from parquet_anonymizer.config import DEFAULT_PARQUET_CODEC, PARQUET_CODECS, Config
+
+# Codec names in parquet metadata that differ from the names pyarrow writes them with
+STORED_CODECS = {"UNCOMPRESSED": "none", "LZ4_RAW": "lz4"}
+
+# Key-value metadata pyarrow derives from the written schema itself
+ARROW_SCHEMA_KEY = b"ARROW:schema"
+
+
+def parquet_writer_options(config: Config, in_filename: str = None) -> dict:
+    """
+    The options an output parquet file is written with: keyword arguments of pq.ParquetWriter,
+    plus `row_group_size` and the file's key-value `metadata`.
+
+    With `match_input_layout` the codecs, row group size, statistics, dictionary encoding and
+    key-value metadata are first copied from the input file's metadata. Options set explicitly in
+    the config always take precedence.
+    """
+    options = {
+        "compression": DEFAULT_PARQUET_CODEC,
+        "compression_level": None,
+        "use_dictionary": True,
+        "write_statistics": True,
+        "row_group_size": config.batch_size,
+        "metadata": {},
+    }
+    if config.match_input_layout and in_filename is not None:
+        options.update(read_parquet_layout(in_filename))
+    configured = {
+        "compression": config.compression,
+        "compression_level": config.compression_level,
+        "use_dictionary": config.dictionary,
+        "write_statistics": config.statistics,
+        "row_group_size": config.row_group_size,
+    }
+    options.update({name: value for name, value in configured.items() if value is not None})
+    codecs = options["compression"]
+    for codec in codecs.values() if isinstance(codecs, dict) else [codecs]:
+        if codec not in PARQUET_CODECS:
+            raise ValueError(
+                f"Unsupported parquet compression: {codec}. Supported are: "
+                + ", ".join(PARQUET_CODECS)
+            )
+    return options
+
+
+def read_parquet_layout(in_filename: str) -> dict:
+    """
+    Reads the writer options a parquet file was written with from its metadata, in the form of
+    parquet_writer_options. Per-column settings are collapsed into one value where all columns
+    agree. Compression levels are not stored in parquet files and can't be recovered.
+    """
+    metadata = pq.ParquetFile(in_filename).metadata
+    layout = {
+        "metadata": {
+            key: value
+            for key, value in (metadata.metadata or {}).items()
+            if key != ARROW_SCHEMA_KEY
+        }
+    }
+    if metadata.num_row_groups == 0:
+        return layout
+    row_group = metadata.row_group(0)
+    chunks = [row_group.column(column) for column in range(row_group.num_columns)]
+    layout["compression"] = _collapse(
+        {
+            chunk.path_in_schema: STORED_CODECS.get(chunk.compression, chunk.compression.lower())
+            for chunk in chunks
+        }
+    )
+    layout["use_dictionary"] = _collapse_columns(
+        {
+            chunk.path_in_schema: any("DICTIONARY" in encoding for encoding in chunk.encodings)
+            for chunk in chunks
+        }
+    )
+    layout["write_statistics"] = _collapse_columns(
+        {chunk.path_in_schema: chunk.is_stats_set for chunk in chunks}
+    )
+    layout["row_group_size"] = max(
+        metadata.row_group(index).num_rows for index in range(metadata.num_row_groups)
+    )
+    return layout
+
+
+def _collapse(per_column: dict):
+    """A single value if all columns share it, else the per-column dict"""
+    values = set(per_column.values())
+    return values.pop() if len(values) == 1 else per_column
+
+
+def _collapse_columns(per_column: dict):
+    """True or False if all columns agree, else the list of columns the flag is set for"""
+    collapsed = _collapse(per_column)
+    if isinstance(collapsed, dict):
+        return [column for column, enabled in per_column.items() if enabled]
+    return collapsed
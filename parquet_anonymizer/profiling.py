@@ -0,0 +1,127 @@
+import cProfile
+import os
+import pstats
+import sys
+import threading
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+
+PIPELINE_SECTION = "pipeline"
+DEFAULT_SAMPLE_INTERVAL = 0.001
+# Functions listed per section in the summary
+SUMMARY_FUNCTIONS = 25
+
+_active = None
+
+
+def section(name):
+    """
+    Profiles the enclosed code as a section of its own of the active Profiler. Without an active
+    Profiler this is a no-op, so hooks can stay in the hot path.
+    """
+    if _active is None:
+        return nullcontext()
+    return _active.section(name)
+
+
+def field_type_section(type_name):
+    return section(f"field_type.{type_name}")
+
+
+class Profiler:
+    """
+    Opt-in profiling of everything run while it is active, e.g.
+
+        with Profiler("profile"):
+            anonymize_path(config, "in.parquet", "out.parquet")
+
+    Time is split into sections: code run through field_type_section(), i.e. generating a field
+    type's values including user types and callbacks, counts for that field type, and all the
+    rest for the pipeline. Each section gets a cProfile profile, plus stacks sampled every
+    `sample_interval` seconds. On exit, `out_dir` receives per section a `.pstats` file, for
+    pstats or snakeviz, and a `.collapsed` file of the sampled stacks, for flamegraph.pl or
+    speedscope, along with `summary.txt` listing each section's most expensive functions.
+
+    Only the current process is profiled, so field types that run in worker processes are not.
+    """
+
+    def __init__(self, out_dir, sample_interval=DEFAULT_SAMPLE_INTERVAL):
+        self.out_dir = out_dir
+        self.sample_interval = sample_interval
+        self.profiles = {}
+        self.samples = {}
+        self._sections = []
+        self._thread_id = None
+        self._stopped = threading.Event()
+        self._sampler = None
+
+    def __enter__(self):
+        global _active
+        if _active is not None:
+            raise ValueError("Another Profiler is already active.")
+        _active = self
+        self._thread_id = threading.get_ident()
+        self._sampler = threading.Thread(target=self._sample, daemon=True)
+        self._sampler.start()
+        self._enter_section(PIPELINE_SECTION)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        global _active
+        self._exit_section()
+        self._stopped.set()
+        self._sampler.join()
+        _active = None
+        self.write()
+
+    @contextmanager
+    def section(self, name):
+        self._enter_section(name)
+        try:
+            yield
+        finally:
+            self._exit_section()
+
+    def _enter_section(self, name):
+        # only one profiler can be enabled at a time
+        if self._sections:
+            self.profiles[self._sections[-1]].disable()
+        self._sections.append(name)
+        self.profiles.setdefault(name, cProfile.Profile()).enable()
+
+    def _exit_section(self):
+        self.profiles[self._sections.pop()].disable()
+        if self._sections:
+            self.profiles[self._sections[-1]].enable()
+
+    def _sample(self):
+        while not self._stopped.wait(self.sample_interval):
+            frame = sys._current_frames().get(self._thread_id)
+            sections = self._sections
+            if frame is None or not sections:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(
+                    f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+                )
+                frame = frame.f_back
+            self.samples.setdefault(sections[-1], Counter())[";".join(reversed(stack))] += 1
+
+    def write(self):
+        os.makedirs(self.out_dir, exist_ok=True)
+        with open(os.path.join(self.out_dir, "summary.txt"), "w") as summary:
+            for name, profile in self.profiles.items():
+                profile.dump_stats(os.path.join(self.out_dir, f"{name}.pstats"))
+                with open(os.path.join(self.out_dir, f"{name}.collapsed"), "w") as collapsed:
+                    for stack, count in sorted(self.samples.get(name, {}).items()):
+                        collapsed.write(f"{stack} {count}\n")
+                summary.write(f"=== {name} ===\n")
+                try:
+                    stats = pstats.Stats(profile, stream=summary)
+                except TypeError:
+                    # nothing was recorded in the section
+                    summary.write("No calls recorded.\n\n")
+                    continue
+                stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(SUMMARY_FUNCTIONS)
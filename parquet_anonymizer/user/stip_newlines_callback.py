@@ -1,6 +1,8 @@
 import os
 from abc import ABC
 
+import polars as pl
+
 from .user_callback import UserCallback
 
 
@@ -10,3 +12,12 @@ class StripNewlinesCallBack(UserCallback, ABC):
 
     def handleResult(self, column_type: str, supplied_value: str, anonymized_value: str) -> str:
         return anonymized_value.replace("\r", "").replace(os.linesep, "")
+
+    def handle_batch(
+        self, column_type: str, original: pl.Series, anonymized: pl.Series
+    ) -> pl.Series:
+        if anonymized.dtype != pl.Utf8:
+            return anonymized
+        return anonymized.str.replace_all("\r", "", literal=True).str.replace_all(
+            os.linesep, "", literal=True
+        )
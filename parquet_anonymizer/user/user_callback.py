@@ -1,5 +1,7 @@
 from abc import abstractmethod
 
+import polars as pl
+
 
 class UserCallback:
     def __init__(self, *args, **kwargs):
@@ -9,3 +11,23 @@ class UserCallback:
     def handleResult(self, column_type: str, supplied_value: str, anonymized_value: str) -> str:
         """Called after obfuscation. Log or tweak the value, but you must give it back"""
         pass
+
+    def handle_batch(
+        self, column_type: str, original: pl.Series, anonymized: pl.Series
+    ) -> pl.Series:
+        """
+        Called after obfuscation, once per column or chunk of a column, with its distinct non-null
+        values and their anonymized values in the same order. Log or tweak the anonymized values,
+        but you must give them back, with the same length and dtype.
+
+        By default handleResult is called for every value. Override this to work on whole series,
+        e.g. with polars expressions, which saves a Python call per value.
+        """
+        return pl.Series(
+            anonymized.name,
+            [
+                self.handleResult(column_type, supplied_value, anonymized_value)
+                for supplied_value, anonymized_value in zip(original, anonymized)
+            ],
+            dtype=anonymized.dtype,
+        )
@@ -1,7 +1,9 @@
+import os
 import random
 import string
 
 DEFAULT_KEY_FILE = "anonymizer.key"
+CACHE_DIR_ENV_VAR = "PARQUET_ANONYMIZER_CACHE_DIR"
 
 
 def keygen(key_file_path = DEFAULT_KEY_FILE):
@@ -11,3 +13,14 @@ def keygen(key_file_path = DEFAULT_KEY_FILE):
             random.SystemRandom().choice(string.ascii_uppercase + string.digits) for _ in range(15)
         )
         key_file.write(key)
+
+
+def get_cache_dir():
+    """Directory for on-disk caches, can be overridden with PARQUET_ANONYMIZER_CACHE_DIR"""
+    cache_dir = os.environ.get(CACHE_DIR_ENV_VAR)
+    if cache_dir is None:
+        cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+            os.path.expanduser("~"), ".cache"
+        )
+        cache_dir = os.path.join(cache_home, "parquet_anonymizer")
+    return cache_dir
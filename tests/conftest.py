@@ -0,0 +1,47 @@
+import os
+
+import polars as pl
+import pytest
+
+from parquet_anonymizer.config import Config
+from parquet_anonymizer.util import CACHE_DIR_ENV_VAR
+
+SECRET_KEY = "TESTKEY"
+
+
+def make_config(**kwargs) -> Config:
+    """A config anonymizing the columns of sample_dataframe with a fixed secret key"""
+    config = Config(**kwargs)
+    config.secret_key = SECRET_KEY
+    config.add_column_config("name", {"type": "first_name"})
+    config.add_column_config("city", {"type": "city"})
+    config.add_column_config("amount", {"type": "int_range", "start": 0, "end": 1000})
+    config.add_column_config("code", {"type": "custom", "format": "##-??"})
+    return config
+
+
+@pytest.fixture(autouse=True, scope="session")
+def cache_dir(tmp_path_factory):
+    """Keeps the provider pools and mapping caches the tests build out of the user's cache"""
+    cache_dir = tmp_path_factory.mktemp("cache")
+    previous = os.environ.get(CACHE_DIR_ENV_VAR)
+    os.environ[CACHE_DIR_ENV_VAR] = str(cache_dir)
+    yield cache_dir
+    if previous is None:
+        del os.environ[CACHE_DIR_ENV_VAR]
+    else:
+        os.environ[CACHE_DIR_ENV_VAR] = previous
+
+
+@pytest.fixture
+def sample_dataframe() -> pl.DataFrame:
+    rows = 2_500
+    return pl.DataFrame(
+        {
+            "id": range(rows),
+            "name": [f"name-{i % 400}" if i % 7 else None for i in range(rows)],
+            "city": [f"city-{i % 50}" for i in range(rows)],
+            "amount": [i % 300 for i in range(rows)],
+            "code": [f"code-{i % 900}" for i in range(rows)],
+        }
+    )
@@ -0,0 +1,95 @@
+import os
+
+import pytest
+
+from parquet_anonymizer.batch import anonymize_files, config_hash, file_hash
+
+from .conftest import make_config
+
+
+@pytest.fixture
+def input_dir(tmp_path, sample_dataframe):
+    input_dir = tmp_path / "in"
+    input_dir.mkdir()
+    for number in range(3):
+        sample_dataframe.write_parquet(input_dir / f"part-{number}.parquet")
+    return input_dir
+
+
+def statuses(entries) -> list[str]:
+    return sorted(entry["status"] for entry in entries)
+
+
+@pytest.mark.parametrize(
+    "setting",
+    [
+        {"compression": "snappy"},
+        {"row_group_size": 100},
+        {"passthrough": True},
+        {"match_input_layout": True},
+        {"streaming": True},
+        {"batch_size": 500},
+        {"dictionary": False},
+    ],
+)
+def test_config_hash_covers_writer_settings(setting):
+    assert config_hash(make_config(**setting)) != config_hash(make_config())
+
+
+def test_resumed_run_skips_finished_files(tmp_path, input_dir):
+    out_dir = tmp_path / "out"
+    first = anonymize_files(make_config(), [str(input_dir)], str(out_dir), jobs=2)
+    assert statuses(first) == ["done"] * 3
+    for entry in first:
+        assert entry["input_hash"] == file_hash(entry["input"])
+
+    resumed = anonymize_files(make_config(), [str(input_dir)], str(out_dir))
+    assert statuses(resumed) == ["skipped"] * 3
+
+    # touched but unchanged inputs are recognized by their hash
+    os.utime(input_dir / "part-0.parquet", ns=(0, 0))
+    resumed = anonymize_files(make_config(), [str(input_dir)], str(out_dir))
+    assert statuses(resumed) == ["skipped"] * 3
+
+
+def test_resumed_run_with_other_writer_settings_reruns_files(tmp_path, input_dir):
+    out_dir = tmp_path / "out"
+    anonymize_files(make_config(), [str(input_dir)], str(out_dir))
+    rerun = anonymize_files(make_config(compression="snappy"), [str(input_dir)], str(out_dir))
+    assert statuses(rerun) == ["done"] * 3
+
+
+def test_resumed_run_reruns_changed_inputs(tmp_path, input_dir, sample_dataframe):
+    out_dir = tmp_path / "out"
+    anonymize_files(make_config(), [str(input_dir)], str(out_dir))
+    sample_dataframe.head(10).write_parquet(input_dir / "part-1.parquet")
+    rerun = anonymize_files(make_config(), [str(input_dir)], str(out_dir))
+    assert statuses(rerun) == ["done", "skipped", "skipped"]
+
+
+def test_output_dir_inside_input_dir_is_not_an_input(input_dir):
+    out_dir = input_dir / "out"
+    for _ in range(3):
+        entries = anonymize_files(make_config(), [str(input_dir)], str(out_dir))
+        assert len(entries) == 3
+    outputs = sorted(path.relative_to(input_dir) for path in input_dir.rglob("*.parquet"))
+    assert [str(path) for path in outputs] == [
+        *(os.path.join("out", f"part-{number}.parquet") for number in range(3)),
+        *(f"part-{number}.parquet" for number in range(3)),
+    ]
+    assert statuses(entries) == ["skipped"] * 3
+
+
+def test_excluded_paths_are_not_inputs(tmp_path, input_dir):
+    manifest_path = input_dir / "runs" / "manifest.jsonl"
+    entries = anonymize_files(
+        make_config(),
+        [str(input_dir / "*.parquet")],
+        str(tmp_path / "out"),
+        manifest_path=str(manifest_path),
+        exclude=[str(input_dir / "part-1.parquet")],
+    )
+    assert sorted(os.path.basename(entry["input"]) for entry in entries) == [
+        "part-0.parquet",
+        "part-2.parquet",
+    ]
@@ -0,0 +1,64 @@
+import os
+
+import pytest
+from click.testing import CliRunner
+
+from parquet_anonymizer.cli import anonymize_batch, anonymize_dataset
+from parquet_anonymizer.util import DEFAULT_KEY_FILE
+
+from .conftest import make_config
+
+
+@pytest.fixture
+def config_file(tmp_path):
+    config_file = tmp_path / "config.yml"
+    make_config().save_config(str(config_file))
+    return str(config_file)
+
+
+def test_batch_key_is_generated_next_to_the_inputs(tmp_path, sample_dataframe, config_file):
+    input_dir = tmp_path / "in"
+    input_dir.mkdir()
+    sample_dataframe.write_parquet(input_dir / "a.parquet")
+    out_dir = tmp_path / "out"
+
+    arguments = [str(input_dir), "--out-dir", str(out_dir), "--config-file", config_file]
+    result = CliRunner().invoke(anonymize_batch, arguments)
+    assert result.exit_code == 0, result.output
+    assert (input_dir / DEFAULT_KEY_FILE).is_file()
+    assert not any(path.name == DEFAULT_KEY_FILE for path in out_dir.rglob("*"))
+
+    # the resumed run reuses the key, so nothing is anonymized again
+    key = (input_dir / DEFAULT_KEY_FILE).read_text()
+    result = CliRunner().invoke(anonymize_batch, arguments)
+    assert result.exit_code == 0, result.output
+    assert (input_dir / DEFAULT_KEY_FILE).read_text() == key
+
+
+def test_batch_requires_key_file_for_inputs_inside_the_output(
+    tmp_path, sample_dataframe, config_file
+):
+    input_dir = tmp_path / "out" / "in"
+    input_dir.mkdir(parents=True)
+    sample_dataframe.write_parquet(input_dir / "a.parquet")
+
+    arguments = [str(input_dir), "--out-dir", str(tmp_path / "out"), "--config-file", config_file]
+    result = CliRunner().invoke(anonymize_batch, arguments)
+    assert result.exit_code != 0
+    assert "--key-file" in result.output
+    assert not (input_dir / DEFAULT_KEY_FILE).exists()
+
+
+def test_dataset_key_is_generated_next_to_the_input_dataset(
+    tmp_path, sample_dataframe, config_file
+):
+    in_dir = tmp_path / "dataset"
+    (in_dir / "region=north").mkdir(parents=True)
+    sample_dataframe.write_parquet(in_dir / "region=north" / "part-0.parquet")
+    out_dir = tmp_path / "anonymized"
+
+    arguments = [str(in_dir), "--out-dir", str(out_dir), "--config-file", config_file]
+    result = CliRunner().invoke(anonymize_dataset, arguments)
+    assert result.exit_code == 0, result.output
+    assert os.path.isfile(tmp_path / f"dataset_{DEFAULT_KEY_FILE}")
+    assert not os.path.exists(tmp_path / f"anonymized_{DEFAULT_KEY_FILE}")
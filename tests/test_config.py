@@ -0,0 +1,14 @@
+from parquet_anonymizer.config import DEFAULT_BATCH_SIZE, DEFAULT_CACHE_MAX_SIZE_MB, Config
+
+
+def test_unset_keyword_arguments_use_the_defaults(tmp_path):
+    unset = {"batch_size": None, "workers": None, "cache_max_size": None, "delimiter": None}
+    config_file = tmp_path / "config.yml"
+    config_file.write_text("columns_to_anonymize: {}\nbatch_size: 10\n")
+    for config in [Config(**unset), Config(yaml_path=str(config_file), **unset)]:
+        assert config.workers == 1
+        assert config.cache_max_size == DEFAULT_CACHE_MAX_SIZE_MB
+        assert config.delimiter == ","
+    assert Config(**unset).batch_size == DEFAULT_BATCH_SIZE
+    assert Config(yaml_path=str(config_file), **unset).batch_size == 10
+    assert Config(yaml_path=str(config_file), batch_size=20).batch_size == 20
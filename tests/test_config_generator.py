@@ -0,0 +1,44 @@
+from datetime import date, timedelta
+
+import polars as pl
+import pytest
+
+from parquet_anonymizer.config_generator import build_column_profiles
+
+
+@pytest.fixture
+def profiled_dataframe(sample_dataframe):
+    start = date(2001, 3, 4)
+    dates = [
+        None if index % 11 == 0 else (start + timedelta(days=index)).strftime("%d/%m/%Y")
+        for index in range(len(sample_dataframe))
+    ]
+    return sample_dataframe.with_columns(joined=pl.Series(dates))
+
+
+@pytest.mark.parametrize("suffix", ["parquet", "csv"])
+def test_batched_profiles_match_single_batch(tmp_path, profiled_dataframe, suffix):
+    data_file = tmp_path / f"data.{suffix}"
+    getattr(profiled_dataframe, f"write_{suffix}")(data_file)
+
+    whole = build_column_profiles(str(data_file), sample_rows=500, options_threshold=50)
+    batched = build_column_profiles(
+        str(data_file), sample_rows=500, options_threshold=50, batch_size=300
+    )
+
+    assert whole.keys() == batched.keys()
+    for name, profile in whole.items():
+        other = batched[name]
+        for key in ("count", "null_count", "min", "max", "first_value", "cardinality"):
+            assert other[key] == profile[key], (name, key)
+        assert (other["registers"] == profile["registers"]).all()
+        assert other["uniques"] == profile["uniques"]
+        assert sorted(other["sample"].to_list(), key=str) == sorted(
+            profile["sample"].to_list(), key=str
+        )
+    assert batched["joined"]["date_format"] == "%d/%m/%Y"
+    assert batched["joined"]["date_min"] == whole["joined"]["date_min"]
+    assert batched["joined"]["date_max"] == whole["joined"]["date_max"]
+    assert batched["joined"]["date_max"].date() == date(2001, 3, 4) + timedelta(
+        days=len(profiled_dataframe) - 1
+    )
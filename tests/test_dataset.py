@@ -0,0 +1,82 @@
+import os
+
+import polars as pl
+import pytest
+
+from parquet_anonymizer.batch import anonymize_parquet_dataset, dataset_sidecar_path
+
+from .conftest import make_config
+
+DAYS = ["2024-01-01", "2024-01-02"]
+REGIONS = ["north", "south"]
+
+
+@pytest.fixture
+def dataset(tmp_path, sample_dataframe):
+    """A dt=/region= partitioned dataset, whose files don't store the partition columns"""
+    in_dir = tmp_path / "dataset"
+    for number, (day, region) in enumerate((day, region) for day in DAYS for region in REGIONS):
+        partition = in_dir / f"dt={day}" / f"region={region}"
+        partition.mkdir(parents=True)
+        sample_dataframe.slice(number * 500, 500).write_parquet(partition / "part-0.parquet")
+    return in_dir
+
+
+def relative_files(directory) -> list[str]:
+    return sorted(str(path.relative_to(directory)) for path in directory.rglob("*.parquet"))
+
+
+def test_dataset_keeps_its_partitioning(tmp_path, dataset, sample_dataframe):
+    out_dir = tmp_path / "anonymized"
+    entries = anonymize_parquet_dataset(make_config(), str(dataset), str(out_dir), jobs=2)
+
+    assert sorted(entry["status"] for entry in entries) == ["done"] * 4
+    assert relative_files(out_dir) == relative_files(dataset)
+    assert os.path.isfile(dataset_sidecar_path(str(out_dir), "manifest.jsonl"))
+    anonymized = pl.read_parquet(out_dir / "**" / "*.parquet", hive_partitioning=True)
+    assert sorted(anonymized["region"].unique()) == REGIONS
+    assert anonymized["id"].sort().equals(sample_dataframe["id"].head(2_000))
+    part = pl.read_parquet(out_dir / f"dt={DAYS[0]}" / f"region={REGIONS[0]}" / "part-0.parquet")
+    assert "region" not in part.columns and "dt" not in part.columns
+
+    resumed = anonymize_parquet_dataset(make_config(), str(dataset), str(out_dir))
+    assert sorted(entry["status"] for entry in resumed) == ["skipped"] * 4
+
+
+def test_anonymized_partition_values_name_the_output_partitions(tmp_path, dataset):
+    # one file stores the partition column as well, which gets the same anonymized value
+    stored = dataset / f"dt={DAYS[1]}" / "region=north" / "part-0.parquet"
+    pl.read_parquet(stored).with_columns(region=pl.lit("north")).write_parquet(stored)
+    config = make_config()
+    config.add_column_config("region", {"type": "custom", "format": "??????##"})
+    out_dir = tmp_path / "anonymized"
+
+    entries = anonymize_parquet_dataset(config, str(dataset), str(out_dir))
+
+    assert [entry["status"] for entry in entries] == ["done"] * 4
+    regions = {path.name for path in out_dir.glob("dt=*/region=*")}
+    assert len(regions) == 2 and not regions & {f"region={region}" for region in REGIONS}
+    out_filename = entries[[entry["input"] for entry in entries].index(str(stored))]["output"]
+    region = os.path.basename(os.path.dirname(out_filename)).partition("=")[2]
+    assert pl.read_parquet(out_filename)["region"].unique().to_list() == [region]
+
+
+def test_partitions_anonymized_to_the_same_value_are_merged(tmp_path, dataset):
+    config = make_config()
+    config.add_column_config("region", {"type": "options", "options": ["anywhere"]})
+    out_dir = tmp_path / "anonymized"
+
+    entries = anonymize_parquet_dataset(config, str(dataset), str(out_dir))
+
+    assert [entry["status"] for entry in entries] == ["done"] * 4
+    assert relative_files(out_dir) == [
+        os.path.join(f"dt={day}", "region=anywhere", name)
+        for day in DAYS
+        for name in ["part-0.parquet", "part-0_1.parquet"]
+    ]
+    anonymized = pl.read_parquet(out_dir / "**" / "*.parquet", hive_partitioning=True)
+    assert len(anonymized) == 2_000
+    assert anonymized["region"].unique().to_list() == ["anywhere"]
+
+    resumed = anonymize_parquet_dataset(config, str(dataset), str(out_dir))
+    assert [entry["status"] for entry in resumed] == ["skipped"] * 4
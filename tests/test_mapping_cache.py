@@ -0,0 +1,59 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import polars as pl
+import pytest
+
+from parquet_anonymizer.anonymizer import anonymize_dataframe, anonymize_parquet
+from parquet_anonymizer.mapping_cache import MappingCache
+
+from .conftest import make_config
+from .test_streaming import md5
+
+
+@pytest.mark.parametrize("vectorized", [False, True])
+def test_cache_round_trip_matches_cold_run(tmp_path, sample_dataframe, vectorized):
+    cold = anonymize_dataframe(make_config(vectorized=vectorized), sample_dataframe)
+    config = make_config(vectorized=vectorized, cache_dir=str(tmp_path / "cache"))
+
+    with MappingCache(config.cache_dir) as cache:
+        filled = anonymize_dataframe(config, sample_dataframe, cache=cache)
+        assert cache.stats()["hits"] == 0
+    with MappingCache(config.cache_dir) as cache:
+        cached = anonymize_dataframe(config, sample_dataframe, cache=cache)
+        assert cache.stats()["misses"] == 0
+
+    assert filled.equals(cold)
+    assert cached.equals(cold)
+    assert cached.schema == cold.schema
+
+
+def anonymize_file(in_filename, out_filename, cache_dir):
+    config = make_config(streaming=True, batch_size=250, cache_dir=cache_dir)
+    anonymize_parquet(config, in_filename, out_filename)
+    return md5(out_filename)
+
+
+def test_processes_sharing_a_cache_match_cold_run(tmp_path, sample_dataframe):
+    in_filename = tmp_path / "in.parquet"
+    sample_dataframe.write_parquet(in_filename)
+    cold = tmp_path / "cold.parquet"
+    anonymize_parquet(make_config(streaming=True, batch_size=250), in_filename, cold)
+    cache_dir = str(tmp_path / "cache")
+
+    # every batch of every process looks up and inserts values at the same time as the others
+    with ProcessPoolExecutor(
+        max_workers=3, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        futures = [
+            executor.submit(anonymize_file, in_filename, tmp_path / f"out-{run}.parquet", cache_dir)
+            for run in range(6)
+        ]
+        hashes = [future.result() for future in futures]
+
+    assert hashes == [md5(cold)] * len(hashes)
+    anonymized = pl.read_parquet(tmp_path / "out-0.parquet")
+    with MappingCache(cache_dir) as cache:
+        warm = anonymize_dataframe(make_config(cache_dir=cache_dir), sample_dataframe, cache=cache)
+        assert cache.stats()["misses"] == 0
+    assert warm.equals(anonymized)
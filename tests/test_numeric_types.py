@@ -0,0 +1,48 @@
+import polars as pl
+import pytest
+
+from parquet_anonymizer.anonymizer import anonymize_dataframe
+from parquet_anonymizer.config import Config
+from parquet_anonymizer.field_types.field_type_factory import FieldTypeFactory
+
+
+@pytest.mark.parametrize(
+    "type_config_dict, dtype, expected_dtype",
+    [
+        ({"type": "normal_int", "mean": 500, "st_dev": 20}, pl.UInt8, pl.Int64),
+        ({"type": "normal_int", "mean": 50, "st_dev": 5}, pl.UInt8, pl.UInt8),
+        ({"type": "int_range", "start": 0, "end": 1_000}, pl.Int8, pl.Int64),
+        ({"type": "int_range", "start": -5, "end": 5}, pl.UInt16, pl.Int64),
+        ({"type": "int_range", "start": 0, "end": 100}, pl.Int8, pl.Int8),
+        ({"type": "float_range", "start": 0, "end": 100}, pl.Float32, pl.Float32),
+        ({"type": "float_range", "start": 0, "end": 1_000}, pl.UInt8, pl.Float64),
+    ],
+)
+def test_column_dtype_is_kept_when_every_value_fits(type_config_dict, dtype, expected_dtype):
+    field_type = FieldTypeFactory.get_type(type_config_dict)
+    series = pl.Series("column", range(100), dtype=dtype)
+    anonymized = field_type.generate_obfuscated_series("SECRET", series)
+    assert anonymized.dtype == expected_dtype
+    assert anonymized.null_count() == 0
+
+
+def test_widened_column_has_the_same_dtype_in_every_batch():
+    config = Config(vectorized=True)
+    config.secret_key = "SECRET"
+    config.add_column_config("age", {"type": "normal_int", "mean": 500, "st_dev": 20})
+    df = pl.DataFrame({"age": pl.Series(range(200), dtype=pl.UInt8)})
+    batches = [anonymize_dataframe(config, batch) for batch in df.iter_slices(50)]
+    assert {batch["age"].dtype for batch in batches} == {pl.Int64}
+    assert pl.concat(batches)["age"].min() > 255
+
+
+@pytest.mark.parametrize("mask", [None, "11100"])
+@pytest.mark.parametrize("dtype, expected_dtype", [(pl.Int32, pl.Int32), (pl.Int16, pl.Int64)])
+def test_zip_keeps_integer_columns_integers(mask, dtype, expected_dtype):
+    field_type = FieldTypeFactory.get_type({"type": "zip", "mask": mask})
+    series = pl.Series("zip", [12345, 2134, 9999], dtype=dtype)
+    anonymized = field_type.generate_obfuscated_series("SECRET", series)
+    assert anonymized.dtype == expected_dtype
+    assert anonymized.null_count() == 0
+    text = field_type.generate_obfuscated_series("SECRET", series.cast(pl.Utf8))
+    assert anonymized.cast(pl.Utf8).equals(text.str.strip_chars_start("0"))
@@ -0,0 +1,40 @@
+import polars as pl
+import pytest
+
+from parquet_anonymizer.field_types.options import Options
+
+
+def test_per_value_draw_is_deterministic():
+    options = Options({"type": "options", "options": ["a", "b", "c"]})
+    drawn = [options.generate_obfuscated_value("SECRET", value) for value in range(20)]
+    assert drawn == [options.generate_obfuscated_value("SECRET", value) for value in range(20)]
+    assert set(drawn) == {"a", "b", "c"}
+
+
+def test_empty_options_are_rejected():
+    with pytest.raises(ValueError, match="at least one option"):
+        Options({"type": "options", "options": []})
+
+
+@pytest.mark.parametrize("dtype", [None, "categorical", "enum"])
+def test_mixed_type_options(dtype):
+    options = Options({"type": "options", "options": [1, "two", 3.0], "dtype": dtype})
+    series = pl.Series("column", [f"value-{i}" for i in range(50)])
+    anonymized = options.cast_output(options.generate_obfuscated_series("SECRET", series))
+    assert set(anonymized.cast(pl.Utf8)) == {"1", "two", "3.0"}
+
+
+@pytest.mark.parametrize(
+    "option_values, column, expected_dtype",
+    [
+        ([1, 2, 3], pl.Series([10, 20], dtype=pl.Int32), pl.Int32),
+        (["1", "2"], pl.Series([10, 20], dtype=pl.Int16), pl.Int16),
+        ([1.5, 2.5], pl.Series([10, 20], dtype=pl.Int64), pl.Float64),
+        (["low", "high"], pl.Series([10, 20], dtype=pl.Int64), pl.Utf8),
+    ],
+)
+def test_options_keep_the_column_dtype_when_they_fit(option_values, column, expected_dtype):
+    options = Options({"type": "options", "options": option_values})
+    anonymized = options.generate_obfuscated_series("SECRET", column)
+    assert anonymized.dtype == expected_dtype
+    assert set(anonymized.cast(pl.Utf8)) <= set(pl.Series(option_values).cast(pl.Utf8))
@@ -0,0 +1,35 @@
+import polars as pl
+import pyarrow.parquet as pq
+
+from parquet_anonymizer.anonymizer import anonymize_parquet
+
+from .conftest import make_config
+
+
+def test_passthrough_keeps_layout_and_untouched_columns(tmp_path, sample_dataframe):
+    in_filename = tmp_path / "in.parquet"
+    pq.write_table(sample_dataframe.to_arrow(), in_filename, row_group_size=1_000)
+    out_filename = tmp_path / "out.parquet"
+
+    report = anonymize_parquet(make_config(passthrough=True), in_filename, out_filename)
+
+    metadata = pq.ParquetFile(in_filename).metadata
+    chunks = [
+        metadata.row_group(row_group).column(column)
+        for row_group in range(metadata.num_row_groups)
+        for column in range(metadata.num_columns)
+    ]
+    assert report["untouched_bytes"] == sum(
+        chunk.total_compressed_size for chunk in chunks if chunk.path_in_schema == "id"
+    )
+    assert report["anonymized_bytes"] == sum(
+        chunk.total_compressed_size for chunk in chunks if chunk.path_in_schema != "id"
+    )
+
+    out_metadata = pq.ParquetFile(out_filename).metadata
+    sizes = [out_metadata.row_group(index).num_rows for index in range(out_metadata.num_row_groups)]
+    assert sizes == [1_000, 1_000, 500]
+    anonymized = pl.read_parquet(out_filename)
+    assert anonymized.schema == sample_dataframe.schema
+    assert anonymized["id"].equals(sample_dataframe["id"])
+    assert not anonymized["city"].equals(sample_dataframe["city"])
@@ -0,0 +1,77 @@
+import logging
+
+import polars as pl
+import pytest
+
+from parquet_anonymizer.anonymizer import anonymize_dataframe, dataframe_anonymizer
+from parquet_anonymizer.config import Config
+from parquet_anonymizer.field_types.field_type_factory import FieldTypeFactory
+from parquet_anonymizer.field_types.provider_pools import POOL_SIZE, get_pool_size
+
+
+def anonymize_companies(column_name, type_config_dict, distinct) -> pl.Series:
+    field_type = FieldTypeFactory.get_type({"type": "company", **type_config_dict})
+    values = pl.Series(column_name, [f"company-{i}" for i in range(distinct)])
+    return field_type.generate_obfuscated_series("SECRET", values)
+
+
+def test_pool_size_defaults_and_validates():
+    assert get_pool_size({"type": "company"}) == POOL_SIZE
+    assert get_pool_size({"type": "company", "pool_size": 50}) == 50
+    with pytest.raises(ValueError):
+        get_pool_size({"type": "company", "pool_size": 0})
+
+
+def test_pool_size_caps_distinct_outputs():
+    anonymized = anonymize_companies("employer", {"pool_size": 20}, 200)
+    assert anonymized.n_unique() <= 20
+
+
+def employer_config(**kwargs) -> Config:
+    config = Config(vectorized=True, **kwargs)
+    config.secret_key = "SECRET"
+    config.add_column_config("employer", {"type": "company", "pool_size": 100})
+    return config
+
+
+@pytest.mark.parametrize(
+    "settings",
+    [{}, {"cache": True}, {"workers": 2}],
+    ids=["batches", "cached", "workers"],
+)
+def test_overflow_is_checked_over_the_whole_column(caplog, tmp_path, settings):
+    # 300 distinct values in batches of 80 rows: no batch, chunk or cache miss exceeds the pool
+    df = pl.DataFrame({"employer": [f"company-{i}" for i in range(300)]})
+    config = employer_config(cache_dir=str(tmp_path), **settings)
+    if config.cache:
+        with dataframe_anonymizer(config) as anonymize:
+            anonymize(df)
+    caplog.clear()
+    with caplog.at_level(logging.WARNING):
+        with dataframe_anonymizer(config) as anonymize:
+            for batch in df.iter_slices(80):
+                anonymize(batch)
+    assert caplog.text.count("Column employer has about") == 1
+    assert "more than the 100 values in its pool" in caplog.text
+
+
+def test_no_overflow_warning_for_repeated_values_across_batches(caplog):
+    df = pl.DataFrame({"employer": [f"company-{i % 90}" for i in range(1_000)]})
+    with caplog.at_level(logging.WARNING):
+        with dataframe_anonymizer(employer_config()) as anonymize:
+            for batch in df.iter_slices(100):
+                anonymize(batch)
+    assert "distinct values" not in caplog.text
+
+
+def test_single_batch_overflow_is_counted_exactly(caplog):
+    df = pl.DataFrame({"employer": [f"company-{i}" for i in range(101)]})
+    with caplog.at_level(logging.WARNING):
+        anonymize_dataframe(employer_config(), df)
+    assert "Column employer has 101 distinct values" in caplog.text
+
+
+def test_larger_pool_reduces_collisions():
+    small = anonymize_companies("supplier", {"pool_size": 100}, 1_000)
+    large = anonymize_companies("customer", {"pool_size": 20_000}, 1_000)
+    assert large.n_unique() > small.n_unique()
@@ -0,0 +1,73 @@
+import polars as pl
+import pytest
+
+from parquet_anonymizer.field_types import BaseFieldType
+from parquet_anonymizer.field_types.field_type_factory import FieldTypeFactory
+from parquet_anonymizer.mapping_cache import MappingCache
+
+# The seeds, and with them the vectorized output, are only the same for one polars version, as
+# polars' hash is. These are the values on the pinned version: when they change, the same secret
+# key no longer produces the same pseudonyms.
+GOLDEN_POLARS_VERSION = "1.11.0"
+golden = pytest.mark.skipif(
+    pl.__version__ != GOLDEN_POLARS_VERSION,
+    reason=f"golden values are for polars {GOLDEN_POLARS_VERSION}",
+)
+
+
+@golden
+def test_generate_seeds_golden_values():
+    seeds = BaseFieldType.generate_seeds("SECRET", pl.Series("name", ["Alice", "Bob", ""]))
+    assert seeds.name == "name"
+    assert seeds.dtype == pl.UInt64
+    assert seeds.to_list() == [9454878079368675791, 13278520956876583713, 13217622649248511831]
+
+
+@golden
+def test_derive_seeds_golden_values():
+    seeds = BaseFieldType.generate_seeds("SECRET", pl.Series(["Alice", "Bob", ""]))
+    assert BaseFieldType.derive_seeds(seeds, 0).equals(seeds)
+    assert BaseFieldType.derive_seeds(seeds, 1).to_list() == [
+        3080175798659138381,
+        240611893792383168,
+        1773726869652918,
+    ]
+
+
+@golden
+def test_vectorized_output_golden_values():
+    expected = [
+        ({"type": "int_range", "start": 0, "end": 1000}, [1, 2, 3], [613, 472, 115]),
+        ({"type": "custom", "format": "##-??"}, ["a", "b"], ["75-yW", "29-vZ"]),
+        ({"type": "zip", "mask": "11100"}, ["12345", "99999"], ["12312", "99927"]),
+    ]
+    for type_config_dict, values, anonymized in expected:
+        field_type = FieldTypeFactory.get_type(type_config_dict)
+        series = field_type.generate_obfuscated_series("SECRET", pl.Series(values))
+        assert series.to_list() == anonymized
+
+
+def test_generate_seeds_hashes_the_text_of_other_types():
+    seeds = BaseFieldType.generate_seeds("SECRET", pl.Series([7, 42, None]))
+    assert seeds.dtype == pl.UInt64
+    assert seeds[2] is None
+    assert seeds.equals(BaseFieldType.generate_seeds("SECRET", pl.Series(["7", "42", None])))
+
+
+def test_seeds_depend_on_the_key_and_the_polars_version(monkeypatch):
+    values = pl.Series(["Alice", "Bob"])
+    seeds = BaseFieldType.generate_seeds("SECRET", values)
+    assert seeds.equals(BaseFieldType.generate_seeds("SECRET", values))
+    assert not seeds.equals(BaseFieldType.generate_seeds("OTHER", values))
+    monkeypatch.setattr(pl, "__version__", "0.0.0")
+    assert not seeds.equals(BaseFieldType.generate_seeds("SECRET", values))
+
+
+def test_cache_keys_are_independent_streams_of_the_seed_hash():
+    values = pl.Series(["Alice", "Bob"])
+    keys = MappingCache.value_keys("SECRET", values)
+    for stream in (1, 2):
+        expected = BaseFieldType.keyed_hash("SECRET", values, stream).reinterpret(signed=True)
+        assert keys[f"key_{stream}"].equals(expected, check_names=False)
+    seeds = BaseFieldType.generate_seeds("SECRET", values).reinterpret(signed=True)
+    assert not keys["key_1"].equals(seeds, check_names=False)
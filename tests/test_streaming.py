@@ -0,0 +1,81 @@
+import hashlib
+
+import polars as pl
+import pyarrow.parquet as pq
+import pytest
+
+from parquet_anonymizer.anonymizer import anonymize_csv, anonymize_parquet
+
+from .conftest import make_config
+
+
+def md5(path) -> str:
+    with open(path, "rb") as file:
+        return hashlib.md5(file.read()).hexdigest()
+
+
+@pytest.mark.parametrize("vectorized", [False, True])
+def test_streaming_parquet_matches_in_memory(tmp_path, sample_dataframe, vectorized):
+    in_filename = tmp_path / "in.parquet"
+    sample_dataframe.write_parquet(in_filename)
+    in_memory = tmp_path / "in_memory.parquet"
+    streamed = tmp_path / "streamed.parquet"
+
+    anonymize_parquet(make_config(batch_size=1_000, vectorized=vectorized), in_filename, in_memory)
+    anonymize_parquet(
+        make_config(batch_size=1_000, vectorized=vectorized, streaming=True), in_filename, streamed
+    )
+
+    assert md5(streamed) == md5(in_memory)
+    anonymized = pl.read_parquet(streamed)
+    assert anonymized["id"].equals(sample_dataframe["id"])
+    assert not anonymized["city"].equals(sample_dataframe["city"])
+    assert anonymized["name"].null_count() == sample_dataframe["name"].null_count()
+
+
+def test_streaming_csv_matches_in_memory(tmp_path, sample_dataframe):
+    in_filename = tmp_path / "in.csv"
+    sample_dataframe.write_csv(in_filename)
+    in_memory = tmp_path / "in_memory.csv"
+    streamed = tmp_path / "streamed.csv"
+
+    anonymize_csv(make_config(), in_filename, in_memory)
+    anonymize_csv(make_config(batch_size=700, streaming=True), in_filename, streamed)
+
+    assert md5(streamed) == md5(in_memory)
+
+
+@pytest.mark.parametrize("batch_size, row_group_size", [(400, 300), (300, 700), (1_000, 1_000)])
+def test_streaming_parquet_row_groups_match_in_memory(
+    tmp_path, sample_dataframe, batch_size, row_group_size
+):
+    in_filename = tmp_path / "in.parquet"
+    sample_dataframe.write_parquet(in_filename)
+    in_memory = tmp_path / "in_memory.parquet"
+    streamed = tmp_path / "streamed.parquet"
+
+    anonymize_parquet(make_config(row_group_size=row_group_size), in_filename, in_memory)
+    anonymize_parquet(
+        make_config(batch_size=batch_size, row_group_size=row_group_size, streaming=True),
+        in_filename,
+        streamed,
+    )
+
+    metadata = pq.ParquetFile(streamed).metadata
+    sizes = [metadata.row_group(index).num_rows for index in range(metadata.num_row_groups)]
+    full_groups, last_group = divmod(len(sample_dataframe), row_group_size)
+    assert sizes == [row_group_size] * full_groups + ([last_group] if last_group else [])
+    assert md5(streamed) == md5(in_memory)
+
+
+def test_streaming_empty_parquet_matches_in_memory(tmp_path, sample_dataframe):
+    in_filename = tmp_path / "in.parquet"
+    sample_dataframe.clear().write_parquet(in_filename)
+    in_memory = tmp_path / "in_memory.parquet"
+    streamed = tmp_path / "streamed.parquet"
+
+    anonymize_parquet(make_config(), in_filename, in_memory)
+    anonymize_parquet(make_config(streaming=True), in_filename, streamed)
+
+    assert md5(streamed) == md5(in_memory)
+    assert pl.read_parquet(streamed).schema == pl.read_parquet(in_memory).schema